@@ -2,6 +2,7 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
+from django.db.models import Prefetch, prefetch_related_objects
 
 from cart.models import Cart, CartItem
 from products.models import Product
@@ -9,6 +10,7 @@ from cart.permissions import IsSmartBuyer
 from cart.api.serializers import (
     CartSerializer, CartItemSerializer, AddToCartSerializer
 )
+from products.api.serializers import product_images_prefetch
 
 
 class CartViewSet(viewsets.GenericViewSet):
@@ -31,6 +33,13 @@ class CartViewSet(viewsets.GenericViewSet):
     def list(self, request):
         """Get all cart items for current user"""
         cart = self.get_object()
+        # Load the items with everything the nested ProductListSerializer reads,
+        # in a fixed number of queries however many items the cart holds
+        prefetch_related_objects(
+            [cart],
+            Prefetch('items', queryset=CartItem.objects.select_related('product__seller', 'product__category')),
+            product_images_prefetch('items__product__images'),
+        )
         serializer = self.get_serializer(cart)
         return Response(serializer.data)
 
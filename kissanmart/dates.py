@@ -0,0 +1,17 @@
+"""
+Date helpers shared by the apps' date-range filters
+"""
+from datetime import datetime, time
+
+from django.utils import timezone
+
+
+def day_start(date):
+    """Aware datetime for the first instant of ``date`` in the current timezone.
+
+    Date filters compare a datetime column against these
+    (``order_date__gte=day_start(d)``, ``order_date__lt=day_start(d + 1 day)``)
+    instead of using ``__date``, which casts every row and keeps the column's
+    index from being used.
+    """
+    return timezone.make_aware(datetime.combine(date, time.min))
@@ -0,0 +1,34 @@
+"""
+JSON renderer for the API, encoding with orjson
+"""
+import orjson
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+# Dates and times are handed to DRF's encoder so they are formatted exactly as
+# before (UTC as 'Z'); int dict keys are written as strings, as json.dumps does
+_ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+
+class ORJSONRenderer(JSONRenderer):
+    """JSONRenderer producing the same compact UTF-8 output with orjson's encoder.
+
+    Anything orjson does not encode itself (Decimal, lazy strings, dates, ...)
+    goes through DRF's JSONEncoder.default. Indented output, which clients can
+    request through the Accept header, is left to JSONRenderer.
+    """
+    _encoder = JSONEncoder()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        renderer_context = renderer_context or {}
+        if self.get_indent(accepted_media_type, renderer_context):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        ret = orjson.dumps(data, default=self._encoder.default, option=_ORJSON_OPTIONS)
+        # Escape the line separators JSON allows but JavaScript string literals
+        # do not, as JSONRenderer does
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
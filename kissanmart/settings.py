@@ -251,7 +251,7 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'kissanmart.renderers.ORJSONRenderer',
     ],
     # Allow multipart/form-data (file uploads) and form parsing for endpoints that accept files
     'DEFAULT_PARSER_CLASSES': [
@@ -432,10 +432,14 @@ except Exception:
     pass
 
 # Caching Configuration
+# The cache is shared by every worker process: cached payloads are invalidated
+# with cache.delete() from whichever worker handled the write, and cache.add()
+# is used as a cross-worker lock. It is stored in the database; its table is
+# created by the products migration 0022_create_cache_table.
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-        'LOCATION': 'unique-snowflake',
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'django_cache',
         'TIMEOUT': 300,  # 5 minutes default
         'OPTIONS': {
             'MAX_ENTRIES': 1000,
@@ -4,7 +4,8 @@ from django.urls import reverse
 from django.utils.safestring import mark_safe
 from .models import (
     Order, OrderItem, DeliveryAddress, OrderTracking, 
-    OrderStatusHistory, OrderRefund, OrderAnalytics
+    OrderStatusHistory, OrderRefund, OrderAnalytics, UserOrderCounters,
+    UserProductStats
 )
 
 
@@ -122,7 +123,17 @@ class OrderAdmin(admin.ModelAdmin):
         return super().get_queryset(request).select_related(
             'user', 'delivery_address'
         ).prefetch_related('items')
-    
+
+    def save_model(self, request, obj, form, change):
+        """Route cancellations through Order.cancel() so product stock is restored"""
+        cancelling = change and 'status' in form.changed_data and obj.status == 'cancelled'
+        if cancelling:
+            # Save the other edits under the stored status; cancel() switches it
+            obj.status = form.initial['status']
+        super().save_model(request, obj, form, change)
+        if cancelling:
+            obj.cancel()
+
     actions = ['mark_as_confirmed', 'mark_as_processing', 'mark_as_shipped']
     
     def mark_as_confirmed(self, request, queryset):
@@ -313,3 +324,19 @@ class OrderAnalyticsAdmin(admin.ModelAdmin):
             'classes': ('collapse',)
         })
     )
+
+
+@admin.register(UserOrderCounters)
+class UserOrderCountersAdmin(admin.ModelAdmin):
+    """Admin for per-user paid order counters"""
+    list_display = ['user', 'total_orders', 'lifetime_revenue', 'updated_at']
+    search_fields = ['user__full_name', 'user__email', 'user__mobile_number']
+    readonly_fields = ['user', 'total_orders', 'lifetime_revenue', 'updated_at']
+
+
+@admin.register(UserProductStats)
+class UserProductStatsAdmin(admin.ModelAdmin):
+    """Admin for per-user product order totals"""
+    list_display = ['user', 'product_name', 'orders_count', 'revenue', 'updated_at']
+    search_fields = ['user__full_name', 'product_name']
+    readonly_fields = ['user', 'product', 'product_name', 'orders_count', 'revenue', 'updated_at']
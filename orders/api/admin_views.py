@@ -15,9 +15,10 @@ from ..models import PaymentModeCharge
 from rest_framework import serializers
 from .serializers import (
     OrderListSerializer, OrderDetailSerializer, OrderUpdateSerializer,
-    OrderAnalyticsSerializer, OrderStatisticsSerializer
+    OrderAnalyticsSerializer
 )
-from .views import OrderPagination
+from .views import OrderPagination, as_float
+from kissanmart.dates import day_start
 
 
 def check_admin_permission(request):
@@ -45,7 +46,7 @@ class AdminOrderListView(generics.ListAPIView):
     
     def get_queryset(self):
         """Get all orders with admin filters"""
-        queryset = Order.objects.all()
+        queryset = Order.objects.without_payloads().with_item_totals().select_related('cancellation_request')
         
         # Apply filters
         status_filter = self.request.query_params.get('status')
@@ -54,7 +55,10 @@ class AdminOrderListView(generics.ListAPIView):
         
         seller_id = self.request.query_params.get('seller_id')
         if seller_id:
-            queryset = queryset.filter(items__seller_id=seller_id).distinct()
+            # Subquery instead of a join so the item annotations are not skewed
+            queryset = queryset.filter(
+                pk__in=OrderItem.objects.filter(seller_id=seller_id).values('order_id')
+            )
         
         customer_id = self.request.query_params.get('customer_id')
         if customer_id:
@@ -64,7 +68,7 @@ class AdminOrderListView(generics.ListAPIView):
         if from_date:
             try:
                 from_date = datetime.strptime(from_date, '%Y-%m-%d').date()
-                queryset = queryset.filter(order_date__date__gte=from_date)
+                queryset = queryset.filter(order_date__gte=day_start(from_date))
             except ValueError:
                 pass
         
@@ -72,7 +76,7 @@ class AdminOrderListView(generics.ListAPIView):
         if to_date:
             try:
                 to_date = datetime.strptime(to_date, '%Y-%m-%d').date()
-                queryset = queryset.filter(order_date__date__lte=to_date)
+                queryset = queryset.filter(order_date__lt=day_start(to_date + timedelta(days=1)))
             except ValueError:
                 pass
         
@@ -98,17 +102,26 @@ class AdminOrderListView(generics.ListAPIView):
         
         response = super().list(request, *args, **kwargs)
         
-        # Enhance response data with additional admin info
+        # Enhance response data with additional admin info, fetched for the
+        # whole page at once rather than per order
+        order_ids = [order_data['id'] for order_data in response.data['results']]
+        customers = {
+            order['id']: order
+            for order in Order.objects.filter(id__in=order_ids).values('id', 'customer_name', 'customer_phone')
+        }
+        seller_names = {}
+        for order_id, seller_name in OrderItem.objects.filter(
+            order_id__in=order_ids
+        ).order_by().values_list('order_id', 'seller__full_name').distinct():
+            seller_names.setdefault(order_id, []).append(seller_name)
+        
         for order_data in response.data['results']:
-            try:
-                order = Order.objects.get(id=order_data['id'])
-                # Add seller information
-                sellers = order.items.values_list('seller__full_name', flat=True).distinct()
-                order_data['seller_names'] = list(sellers)
-                order_data['customer_name'] = order.customer_name
-                order_data['customer_phone'] = order.customer_phone
-            except Order.DoesNotExist:
-                pass
+            customer = customers.get(order_data['id'])
+            if customer is None:
+                continue
+            order_data['seller_names'] = seller_names.get(order_data['id'], [])
+            order_data['customer_name'] = customer['customer_name']
+            order_data['customer_phone'] = customer['customer_phone']
         
         return Response({
             'success': True,
@@ -130,11 +143,7 @@ class AdminOrderDetailView(APIView):
             }, status=status.HTTP_403_FORBIDDEN)
         
         try:
-            order = Order.objects.select_related(
-                'delivery_address', 'tracking', 'user'
-            ).prefetch_related(
-                'items__product', 'items__seller', 'status_history'
-            ).get(uuid=order_uuid)
+            order = Order.objects.with_full_details().get(uuid=order_uuid)
             
             serializer = OrderDetailSerializer(order)
             order_data = serializer.data
@@ -179,8 +188,9 @@ class AdminOrderAnalyticsView(APIView):
                 'message': 'Admin access required'
             }, status=status.HTTP_403_FORBIDDEN)
         
-        now = timezone.now()
-        today = now.date()
+        today = timezone.localdate()
+        today_start = day_start(today)
+        tomorrow_start = today_start + timedelta(days=1)
         week_start = today - timedelta(days=today.weekday())
         month_start = today.replace(day=1)
         
@@ -188,42 +198,66 @@ class AdminOrderAnalyticsView(APIView):
         all_orders = Order.objects.all()
         
         total_orders = all_orders.count()
-        orders_today = all_orders.filter(order_date__date=today).count()
-        orders_this_week = all_orders.filter(order_date__date__gte=week_start).count()
-        orders_this_month = all_orders.filter(order_date__date__gte=month_start).count()
-        
+        orders_today = all_orders.filter(order_date__gte=today_start, order_date__lt=tomorrow_start).count()
+
         # Revenue calculations
         completed_orders = all_orders.filter(payment_status='completed')
-        
+
         revenue_today = completed_orders.filter(
-            order_date__date=today
-        ).aggregate(total=Sum('total_amount'))['total'] or Decimal('0')
-        
-        revenue_this_week = completed_orders.filter(
-            order_date__date__gte=week_start
-        ).aggregate(total=Sum('total_amount'))['total'] or Decimal('0')
-        
-        revenue_this_month = completed_orders.filter(
-            order_date__date__gte=month_start
+            order_date__gte=today_start, order_date__lt=tomorrow_start
         ).aggregate(total=Sum('total_amount'))['total'] or Decimal('0')
+
+        # Week/month totals: past days come from the OrderAnalytics rollups,
+        # which the nightly rollup_order_analytics run recomputes for the last
+        # 31 days (so later changes to past orders show up by the next
+        # morning); today is counted live.
+        # Fall back to scanning orders if any past day has not been rolled up.
+        period_start = min(week_start, month_start)
+        rollups = list(OrderAnalytics.objects.filter(
+            date__gte=period_start, date__lt=today
+        ).values('date', 'total_orders', 'total_revenue'))
+
+        if len(rollups) == (today - period_start).days:
+            orders_this_week = orders_today + sum(r['total_orders'] for r in rollups if r['date'] >= week_start)
+            orders_this_month = orders_today + sum(r['total_orders'] for r in rollups if r['date'] >= month_start)
+            revenue_this_week = revenue_today + sum(
+                (r['total_revenue'] for r in rollups if r['date'] >= week_start), Decimal('0')
+            )
+            revenue_this_month = revenue_today + sum(
+                (r['total_revenue'] for r in rollups if r['date'] >= month_start), Decimal('0')
+            )
+        else:
+            orders_this_week = all_orders.filter(order_date__gte=day_start(week_start)).count()
+            orders_this_month = all_orders.filter(order_date__gte=day_start(month_start)).count()
+
+            revenue_this_week = completed_orders.filter(
+                order_date__gte=day_start(week_start)
+            ).aggregate(total=Sum('total_amount'))['total'] or Decimal('0')
+
+            revenue_this_month = completed_orders.filter(
+                order_date__gte=day_start(month_start)
+            ).aggregate(total=Sum('total_amount'))['total'] or Decimal('0')
         
         # Average order value
         avg_order_value = completed_orders.aggregate(
             avg=Avg('total_amount')
         )['avg'] or Decimal('0')
         
-        # Status breakdown
-        status_breakdown = {}
-        for choice in Order._meta.get_field('status').choices:
-            status_key = choice[0]
-            status_breakdown[status_key] = all_orders.filter(status=status_key).count()
+        # Status breakdown in one grouped query
+        status_counts = dict(
+            all_orders.order_by().values_list('status').annotate(count=Count('id'))
+        )
+        status_breakdown = {
+            status_key: status_counts.get(status_key, 0)
+            for status_key, _ in Order._meta.get_field('status').choices
+        }
         
         # Top products
         top_products = []
         product_stats = OrderItem.objects.filter(
             order__payment_status='completed'
         ).values(
-            'product_name'
+            'product_id', 'product_name'
         ).annotate(
             orders_count=Count('order', distinct=True),
             revenue=Sum('total_price'),
@@ -234,8 +268,8 @@ class AdminOrderAnalyticsView(APIView):
             top_products.append({
                 'product_name': product['product_name'],
                 'orders_count': product['orders_count'],
-                'revenue': float(product['revenue'] or 0),
-                'quantity_sold': float(product['quantity_sold'] or 0)
+                'revenue': as_float(product['revenue']),
+                'quantity_sold': as_float(product['quantity_sold'])
             })
         
         # Top sellers
@@ -255,7 +289,7 @@ class AdminOrderAnalyticsView(APIView):
                 'seller_id': seller['seller_id'],
                 'seller_name': seller['seller__full_name'],
                 'orders_count': seller['orders_count'],
-                'revenue': float(seller['revenue'] or 0),
+                'revenue': as_float(seller['revenue']),
                 'items_sold': seller['items_sold']
             })
         
@@ -274,7 +308,7 @@ class AdminOrderAnalyticsView(APIView):
             top_cities.append({
                 'city': city['delivery_address__city'],
                 'orders_count': city['orders_count'],
-                'revenue': float(city['revenue'] or 0)
+                'revenue': as_float(city['revenue'])
             })
         
         # Monthly trends (last 12 months)
@@ -284,15 +318,15 @@ class AdminOrderAnalyticsView(APIView):
             month_end = (month_start.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
             
             month_orders = all_orders.filter(
-                order_date__date__gte=month_start,
-                order_date__date__lte=month_end,
+                order_date__gte=day_start(month_start),
+                order_date__lt=day_start(month_end + timedelta(days=1)),
                 payment_status='completed'
             )
             
             monthly_trends.insert(0, {
                 'month': month_start.strftime('%Y-%m'),
                 'orders_count': month_orders.count(),
-                'revenue': float(month_orders.aggregate(total=Sum('total_amount'))['total'] or 0)
+                'revenue': as_float(month_orders.aggregate(total=Sum('total_amount'))['total'])
             })
         
         analytics_data = {
@@ -330,25 +364,28 @@ class AdminDashboardStatsView(APIView):
                 'message': 'Admin access required'
             }, status=status.HTTP_403_FORBIDDEN)
         
-        today = timezone.now().date()
+        today_start = day_start(timezone.localdate())
+        tomorrow_start = today_start + timedelta(days=1)
         
         # Quick stats
         total_orders = Order.objects.count()
         pending_orders = Order.objects.filter(status='pending').count()
         processing_orders = Order.objects.filter(status__in=['confirmed', 'processing', 'packed']).count()
         in_transit_orders = Order.objects.filter(status__in=['shipped', 'in_transit']).count()
-        delivered_today = Order.objects.filter(status='delivered', actual_delivery__date=today).count()
+        delivered_today = Order.objects.filter(status='delivered', actual_delivery__gte=today_start, actual_delivery__lt=tomorrow_start).count()
         
         # Revenue stats
         today_revenue = Order.objects.filter(
-            order_date__date=today,
+            order_date__gte=today_start,
+            order_date__lt=tomorrow_start,
             payment_status='completed'
         ).aggregate(total=Sum('total_amount'))['total'] or Decimal('0')
         
         # New customers today
         from users.models import CustomUser
         new_customers_today = CustomUser.objects.filter(
-            created_at__date=today
+            created_at__gte=today_start,
+            created_at__lt=tomorrow_start
         ).count()
         
         # Orders requiring attention (pending > 1 hour)
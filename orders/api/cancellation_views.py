@@ -21,7 +21,8 @@ from .serializers import (
     OrderCancellationRequestSerializer, OrderCancellationRequestCreateSerializer,
     OrderCancellationStatusSerializer, AdminRefundProcessSerializer
 )
-from ..razorpay_service import RazorpayService
+from kissanmart.dates import day_start
+from ..razorpay_service import get_razorpay_service
 from services.shiprocket import get_shiprocket_service
 
 
@@ -264,14 +265,14 @@ class AdminCancellationRequestListView(generics.ListAPIView):
         if start_date:
             try:
                 start_date = datetime.strptime(start_date, '%Y-%m-%d').date()
-                queryset = queryset.filter(requested_at__date__gte=start_date)
+                queryset = queryset.filter(requested_at__gte=day_start(start_date))
             except ValueError:
                 pass
 
         if end_date:
             try:
                 end_date = datetime.strptime(end_date, '%Y-%m-%d').date()
-                queryset = queryset.filter(requested_at__date__lte=end_date)
+                queryset = queryset.filter(requested_at__lt=day_start(end_date + timedelta(days=1)))
             except ValueError:
                 pass
 
@@ -390,7 +391,7 @@ class AdminProcessRefundView(APIView):
 
                 if process_refund and order.razorpay_payment_id:
                     try:
-                        razorpay_service = RazorpayService()
+                        razorpay_service = get_razorpay_service()
 
                         # Determine final refund amount
                         final_amount = Decimal(cancellation_request.final_refund_amount)
@@ -462,9 +463,8 @@ class AdminProcessRefundView(APIView):
                                 cancellation_request.shiprocket_cancellation_response = cancel_response.get('response')
                                 cancellation_request.save()
 
-                                # Update order status to cancelled
-                                order.status = 'cancelled'
-                                order.save()
+                                # Update order status to cancelled and restore product quantities
+                                order.cancel()
 
                                 # Create status history
                                 OrderStatusHistory.objects.create(
@@ -14,7 +14,7 @@ from decimal import Decimal
 import logging
 
 from ..models import Order, OrderStatusHistory
-from ..razorpay_service import RazorpayService
+from ..razorpay_service import get_razorpay_service
 from .serializers import RazorpayOrderCreateSerializer, RazorpayPaymentVerificationSerializer
 
 logger = logging.getLogger(__name__)
@@ -100,7 +100,7 @@ class CreateRazorpayOrderView(APIView):
                     # Continue with existing charges if invalid
             
             # Initialize Razorpay service
-            razorpay_service = RazorpayService()
+            razorpay_service = get_razorpay_service()
             
             # Create Razorpay order
             razorpay_response = razorpay_service.create_order(
@@ -236,7 +236,7 @@ class VerifyRazorpayPaymentView(APIView):
                 }, status=status.HTTP_400_BAD_REQUEST)
             
             # Initialize Razorpay service and verify signature
-            razorpay_service = RazorpayService()
+            razorpay_service = get_razorpay_service()
             
             is_signature_valid = razorpay_service.verify_payment_signature(
                 razorpay_order_id=razorpay_order_id,
@@ -370,7 +370,7 @@ class RazorpayPaymentStatusView(APIView):
                 }, status=status.HTTP_404_NOT_FOUND)
             
             # Initialize Razorpay service and fetch payment
-            razorpay_service = RazorpayService()
+            razorpay_service = get_razorpay_service()
             payment_response = razorpay_service.fetch_payment(order.razorpay_payment_id)
             
             if not payment_response['success']:
@@ -518,7 +518,9 @@ def handle_razorpay_webhook(request):
                 razorpay_order_id = payment_entity.get('order_id')
                 
                 try:
-                    order = Order.objects.get(razorpay_order_id=razorpay_order_id)
+                    # Only pending orders can fail; this also keeps a late failure
+                    # event from overwriting a completed payment
+                    order = Order.objects.get(razorpay_order_id=razorpay_order_id, payment_status='pending')
                     
                     with transaction.atomic():
                         order.payment_status = 'failed'
@@ -534,7 +536,7 @@ def handle_razorpay_webhook(request):
                         )
                 
                 except Order.DoesNotExist:
-                    logger.warning(f"Order not found for order ID: {razorpay_order_id}")
+                    logger.warning(f"No pending order found for order ID: {razorpay_order_id}")
         
         return Response({
             'success': True,
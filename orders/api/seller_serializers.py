@@ -336,26 +336,6 @@ class SellerOrderUpdateSerializer(serializers.Serializer):
         return instance
 
 
-class SellerOrderStatisticsSerializer(serializers.Serializer):
-    """Serializer for seller order statistics"""
-    
-    total_orders = serializers.IntegerField()
-    orders_today = serializers.IntegerField()
-    orders_this_week = serializers.IntegerField()
-    orders_this_month = serializers.IntegerField()
-    
-    total_revenue = serializers.DecimalField(max_digits=12, decimal_places=2)
-    revenue_today = serializers.DecimalField(max_digits=10, decimal_places=2)
-    revenue_this_week = serializers.DecimalField(max_digits=10, decimal_places=2)
-    revenue_this_month = serializers.DecimalField(max_digits=10, decimal_places=2)
-    
-    average_item_value = serializers.DecimalField(max_digits=10, decimal_places=2)
-    item_status_breakdown = serializers.DictField()
-    product_performance = serializers.ListField()
-    recent_activity = serializers.ListField()
-    monthly_revenue_trend = serializers.ListField()
-
-
 class ProductInventorySerializer(serializers.Serializer):
     """Serializer for product inventory information"""
     
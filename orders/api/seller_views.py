@@ -20,9 +20,10 @@ from ..models import (
 )
 from .seller_serializers import (
     SellerOrderListSerializer, SellerOrderDetailSerializer,
-    SellerOrderItemSerializer, SellerOrderUpdateSerializer,
-    SellerOrderStatisticsSerializer
+    SellerOrderItemSerializer, SellerOrderUpdateSerializer
 )
+from .views import as_money
+from kissanmart.dates import day_start
 from products.models import Product
 
 
@@ -51,7 +52,7 @@ class SellerOrdersView(generics.ListAPIView):
         # Get orders that contain items sold by this seller
         queryset = Order.objects.filter(
             items__seller=user
-        ).distinct().select_related(
+        ).distinct().without_payloads().select_related(
             'user', 'delivery_address'
         ).prefetch_related(
             'items__product', 'status_history'
@@ -72,7 +73,7 @@ class SellerOrdersView(generics.ListAPIView):
         if from_date:
             try:
                 from_date = datetime.strptime(from_date, '%Y-%m-%d').date()
-                queryset = queryset.filter(order_date__date__gte=from_date)
+                queryset = queryset.filter(order_date__gte=day_start(from_date))
             except ValueError:
                 pass
         
@@ -80,7 +81,7 @@ class SellerOrdersView(generics.ListAPIView):
         if to_date:
             try:
                 to_date = datetime.strptime(to_date, '%Y-%m-%d').date()
-                queryset = queryset.filter(order_date__date__lte=to_date)
+                queryset = queryset.filter(order_date__lt=day_start(to_date + timedelta(days=1)))
             except ValueError:
                 pass
         
@@ -135,11 +136,7 @@ class SellerOrderDetailView(APIView):
             }, status=status.HTTP_403_FORBIDDEN)
         
         # Get order and ensure the seller has items in it. Use filter().first()
-        orders_qs = Order.objects.select_related(
-            'user', 'delivery_address', 'tracking'
-        ).prefetch_related(
-            'items__product', 'status_history'
-        ).filter(
+        orders_qs = Order.objects.with_full_details().filter(
             uuid=order_uuid,
             items__seller=request.user
         )
@@ -304,10 +301,10 @@ class SellerBulkOrderUpdateView(APIView):
                 for order in orders_to_check:
                     self._update_order_status_if_needed(order)
                 
-                # Create status history entries
+                # Create status history entries in one INSERT instead of one per order
                 if 'item_status' in update_data:
-                    for order in orders_to_check:
-                        OrderStatusHistory.objects.create(
+                    OrderStatusHistory.objects.bulk_create([
+                        OrderStatusHistory(
                             order=order,
                             status=update_data['item_status'],
                             title='Bulk Item Status Update',
@@ -316,6 +313,8 @@ class SellerBulkOrderUpdateView(APIView):
                             changed_by=request.user,
                             change_source='seller_bulk'
                         )
+                        for order in orders_to_check
+                    ], batch_size=500)
                 
                 return Response({
                     'success': True,
@@ -355,10 +354,11 @@ class SellerOrderStatisticsView(APIView):
             }, status=status.HTTP_403_FORBIDDEN)
         
         user = request.user
-        now = timezone.now()
-        today = now.date()
-        week_start = today - timedelta(days=today.weekday())
-        month_start = today.replace(day=1)
+        today = timezone.localdate()
+        today_start = day_start(today)
+        tomorrow_start = today_start + timedelta(days=1)
+        week_start = day_start(today - timedelta(days=today.weekday()))
+        month_start = day_start(today.replace(day=1))
         
         # Base queryset for seller's items
         seller_items = OrderItem.objects.filter(seller=user)
@@ -367,23 +367,24 @@ class SellerOrderStatisticsView(APIView):
         orders_with_seller_items = Order.objects.filter(items__seller=user).distinct()
         
         total_orders = orders_with_seller_items.count()
-        orders_today = orders_with_seller_items.filter(order_date__date=today).count()
-        orders_this_week = orders_with_seller_items.filter(order_date__date__gte=week_start).count()
-        orders_this_month = orders_with_seller_items.filter(order_date__date__gte=month_start).count()
+        orders_today = orders_with_seller_items.filter(order_date__gte=today_start, order_date__lt=tomorrow_start).count()
+        orders_this_week = orders_with_seller_items.filter(order_date__gte=week_start).count()
+        orders_this_month = orders_with_seller_items.filter(order_date__gte=month_start).count()
         
         # Revenue calculations (from seller's items only)
         revenue_today = seller_items.filter(
-            order__order_date__date=today,
+            order__order_date__gte=today_start,
+            order__order_date__lt=tomorrow_start,
             order__payment_status='completed'
         ).aggregate(total=Sum('total_price'))['total'] or Decimal('0')
         
         revenue_this_week = seller_items.filter(
-            order__order_date__date__gte=week_start,
+            order__order_date__gte=week_start,
             order__payment_status='completed'
         ).aggregate(total=Sum('total_price'))['total'] or Decimal('0')
         
         revenue_this_month = seller_items.filter(
-            order__order_date__date__gte=month_start,
+            order__order_date__gte=month_start,
             order__payment_status='completed'
         ).aggregate(total=Sum('total_price'))['total'] or Decimal('0')
         
@@ -414,7 +415,9 @@ class SellerOrderStatisticsView(APIView):
             item_status_breakdown[status_key] = seller_items.filter(item_status=status_key).count()
         
         # Recent activity (last 10 orders with seller's items)
-        recent_orders = orders_with_seller_items.order_by('-created_at')[:10]
+        recent_orders = orders_with_seller_items.only(
+            'id', 'order_date', 'customer_name', 'status'
+        ).order_by('-created_at')[:10]
         recent_activity = []
         for order in recent_orders:
             seller_items_in_order = order.items.filter(seller=user)
@@ -432,8 +435,8 @@ class SellerOrderStatisticsView(APIView):
         for i in range(6):
             month_date = (today.replace(day=1) - timedelta(days=i*30)).replace(day=1)
             month_revenue = seller_items.filter(
-                order__order_date__date__gte=month_date,
-                order__order_date__date__lt=month_date.replace(month=month_date.month+1) if month_date.month < 12 else month_date.replace(year=month_date.year+1, month=1),
+                order__order_date__gte=day_start(month_date),
+                order__order_date__lt=day_start(month_date.replace(month=month_date.month+1) if month_date.month < 12 else month_date.replace(year=month_date.year+1, month=1)),
                 order__payment_status='completed'
             ).aggregate(total=Sum('total_price'))['total'] or Decimal('0')
             
@@ -447,22 +450,23 @@ class SellerOrderStatisticsView(APIView):
             'orders_today': orders_today,
             'orders_this_week': orders_this_week,
             'orders_this_month': orders_this_month,
-            'total_revenue': float(total_revenue),
-            'revenue_today': float(revenue_today),
-            'revenue_this_week': float(revenue_this_week),
-            'revenue_this_month': float(revenue_this_month),
-            'average_item_value': float(avg_item_value),
+            'total_revenue': str(as_money(total_revenue)),
+            'revenue_today': str(as_money(revenue_today)),
+            'revenue_this_week': str(as_money(revenue_this_week)),
+            'revenue_this_month': str(as_money(revenue_this_month)),
+            'average_item_value': str(as_money(avg_item_value)),
             'item_status_breakdown': item_status_breakdown,
             'product_performance': list(product_performance),
             'recent_activity': recent_activity,
             'monthly_revenue_trend': list(reversed(monthly_revenue))
         }
         
-        serializer = SellerOrderStatisticsSerializer(statistics)
-        
+        # The view owns this shape, so return it directly rather than
+        # round-tripping it through a Serializer. Money values are passed as
+        # "123.45" strings, the format the DecimalFields used to emit.
         return Response({
             'success': True,
-            'statistics': serializer.data
+            'statistics': statistics
         })
 
 
@@ -534,17 +538,19 @@ def seller_dashboard_summary(request):
         }, status=status.HTTP_403_FORBIDDEN)
     
     user = request.user
-    today = timezone.now().date()
+    today_start = day_start(timezone.localdate())
+    tomorrow_start = today_start + timedelta(days=1)
     
     # Quick stats
     total_products = Product.objects.filter(seller=user, is_published=True).count()
     total_orders = Order.objects.filter(items__seller=user).distinct().count()
-    today_orders = Order.objects.filter(items__seller=user, order_date__date=today).distinct().count()
+    today_orders = Order.objects.filter(items__seller=user, order_date__gte=today_start, order_date__lt=tomorrow_start).distinct().count()
     
     # Revenue today
     today_revenue = OrderItem.objects.filter(
         seller=user,
-        order__order_date__date=today,
+        order__order_date__gte=today_start,
+        order__order_date__lt=tomorrow_start,
         order__payment_status='completed'
     ).aggregate(total=Sum('total_price'))['total'] or Decimal('0')
     
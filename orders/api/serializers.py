@@ -2,6 +2,7 @@ from rest_framework import serializers
 from decimal import Decimal
 from django.utils import timezone
 from django.db import transaction
+from django.db.models import F
 from datetime import timedelta
 
 from ..models import (
@@ -300,27 +301,33 @@ class OrderCreateSerializer(serializers.Serializer):
             status='confirmed' if validated_data['payment_method'] == 'cod' else 'pending'
         )
         
-        # Create order items and update product quantities
-        total_amount = Decimal('0.00')
+        # Create all order items in one batch
+        order_items = OrderItem.bulk_create_for_order(
+            order,
+            [(item_data['product_id'], item_data['quantity']) for item_data in items_data],
+            unit_prices={
+                item_data['product_id'].pk: item_data.get('unit_price', item_data['product_id'].price_per_unit)
+                for item_data in items_data
+            }
+        )
+        total_amount = sum((order_item.total_price for order_item in order_items), Decimal('0.00'))
+
+        # Take the ordered quantities out of stock. bulk_create skips the
+        # OrderItem signals, so this does their guarded decrement: one UPDATE
+        # per product that only matches while enough stock is left, so
+        # concurrent orders cannot oversell. A shortfall rolls back the order.
+        ordered_quantities = {}
         for item_data in items_data:
             product = item_data['product_id']
-            quantity = item_data['quantity']
-            unit_price = item_data.get('unit_price', product.price_per_unit)
-            
-            # Create order item
-            order_item = OrderItem.objects.create(
-                order=order,
-                product=product,
-                quantity=quantity,
-                unit_price=unit_price,
-                seller=product.seller
-            )
-            
-            total_amount += order_item.total_price
-            
-            # Update product quantity
-            product.quantity_available -= quantity
-            product.save()
+            ordered_quantities[product] = ordered_quantities.get(product, 0) + item_data['quantity']
+        for product, quantity in ordered_quantities.items():
+            updated = Product.objects.filter(
+                pk=product.pk, quantity_available__gte=quantity
+            ).update(quantity_available=F('quantity_available') - quantity)
+            if not updated:
+                raise serializers.ValidationError({
+                    'items': f"Insufficient quantity available for {product.title}"
+                })
         
         # Calculate and save order totals
         order.subtotal = total_amount
@@ -413,7 +420,15 @@ class OrderUpdateSerializer(serializers.ModelSerializer):
     def update(self, instance, validated_data):
         """Update order and create status history"""
         old_status = instance.status
-        instance = super().update(instance, validated_data)
+        cancelling = validated_data.get('status') == 'cancelled' and old_status != 'cancelled'
+        with transaction.atomic():
+            if cancelling:
+                # Save the other fields under the stored status; cancel()
+                # switches it and returns the items' quantities to stock
+                instance = super().update(instance, {k: v for k, v in validated_data.items() if k != 'status'})
+                instance.cancel()
+            else:
+                instance = super().update(instance, validated_data)
         
         # Create status history if status changed
         if 'status' in validated_data and validated_data['status'] != old_status:
@@ -510,21 +525,6 @@ class OrderAnalyticsSerializer(serializers.ModelSerializer):
         ]
 
 
-class OrderStatisticsSerializer(serializers.Serializer):
-    """Serializer for order statistics"""
-    
-    total_orders = serializers.IntegerField()
-    orders_today = serializers.IntegerField()
-    orders_this_week = serializers.IntegerField()
-    orders_this_month = serializers.IntegerField()
-    revenue_today = serializers.DecimalField(max_digits=12, decimal_places=2)
-    revenue_this_week = serializers.DecimalField(max_digits=12, decimal_places=2)
-    revenue_this_month = serializers.DecimalField(max_digits=12, decimal_places=2)
-    average_order_value = serializers.DecimalField(max_digits=10, decimal_places=2)
-    status_breakdown = serializers.DictField()
-    top_products = serializers.ListField()
-
-
 class PaymentSerializer(serializers.Serializer):
     """Serializer for payment processing"""
     
@@ -400,9 +400,8 @@ class CancelShiprocketOrderView(APIView):
                 cancel_response = get_shiprocket_service().cancel_order([int(order.shiprocket_order_id)])
                 
                 if cancel_response['success']:
-                    # Update local order status
-                    order.status = 'cancelled'
-                    order.save()
+                    # Update local order status and restore product quantities
+                    order.cancel()
                     
                     # Create status history
                     OrderStatusHistory.objects.create(
@@ -415,11 +414,6 @@ class CancelShiprocketOrderView(APIView):
                         change_source='customer'
                     )
                     
-                    # Restore product quantities
-                    for item in order.items.all():
-                        item.product.quantity_available += item.quantity
-                        item.product.save()
-                    
                     return Response({
                         'success': True,
                         'message': 'Order cancelled successfully',
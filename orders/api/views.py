@@ -3,30 +3,48 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.pagination import PageNumberPagination
+from django.http import HttpResponse
 from django.shortcuts import get_object_or_404
 from django.db import transaction
 from django.db.models import Q, Sum, Count, Avg
 from django.utils import timezone
+from dataclasses import dataclass, asdict
 from datetime import datetime, timedelta
 from decimal import Decimal
 import uuid
 import logging
+import orjson
 
 logger = logging.getLogger(__name__)
 
 from ..models import (
     Order, OrderItem, DeliveryAddress, OrderTracking, 
-    OrderStatusHistory, OrderRefund, OrderAnalytics
+    OrderStatusHistory, OrderRefund, OrderAnalytics, UserOrderCounters,
+    UserProductStats
 )
 from .serializers import (
     OrderCreateSerializer, OrderListSerializer, OrderDetailSerializer,
     OrderUpdateSerializer, OrderCancelSerializer, OrderReorderSerializer,
-    OrderStatisticsSerializer, PaymentSerializer, LiveTrackingSerializer
+    PaymentSerializer, LiveTrackingSerializer
 )
 from products.models import Product
+from kissanmart.dates import day_start
 from cart.models import Cart
 
 
+def as_float(value):
+    """Convert an aggregate result to float, treating None (no matching rows) as 0.0"""
+    return 0.0 if value is None else float(value)
+
+
+MONEY_QUANTUM = Decimal('0.01')
+
+
+def as_money(value):
+    """Convert an aggregate result to a 2-decimal Decimal, treating None as 0.00"""
+    return (Decimal('0.00') if value is None else Decimal(value)).quantize(MONEY_QUANTUM)
+
+
 class OrderPagination(PageNumberPagination):
     """Custom pagination for orders"""
     page_size = 10
@@ -103,7 +121,9 @@ class UserOrdersView(generics.ListAPIView):
     
     def get_queryset(self):
         """Filter orders for current user"""
-        queryset = Order.objects.filter(user=self.request.user)
+        queryset = Order.objects.filter(
+            user=self.request.user
+        ).without_payloads().with_item_totals().select_related('cancellation_request')
         
         # Apply filters
         status_filter = self.request.query_params.get('status')
@@ -114,7 +134,7 @@ class UserOrdersView(generics.ListAPIView):
         if from_date:
             try:
                 from_date = datetime.strptime(from_date, '%Y-%m-%d').date()
-                queryset = queryset.filter(order_date__date__gte=from_date)
+                queryset = queryset.filter(order_date__gte=day_start(from_date))
             except ValueError:
                 pass
         
@@ -122,7 +142,7 @@ class UserOrdersView(generics.ListAPIView):
         if to_date:
             try:
                 to_date = datetime.strptime(to_date, '%Y-%m-%d').date()
-                queryset = queryset.filter(order_date__date__lte=to_date)
+                queryset = queryset.filter(order_date__lt=day_start(to_date + timedelta(days=1)))
             except ValueError:
                 pass
         
@@ -146,11 +166,7 @@ class OrderDetailView(APIView):
     def get(self, request, order_uuid):
         """Get order details by UUID"""
         try:
-            order = Order.objects.select_related(
-                'delivery_address', 'tracking'
-            ).prefetch_related(
-                'items', 'status_history'
-            ).get(uuid=order_uuid, user=request.user)
+            order = Order.objects.with_full_details().get(uuid=order_uuid, user=request.user)
             
             serializer = OrderDetailSerializer(order)
             
@@ -273,14 +289,8 @@ class CancelOrderView(APIView):
                             logger.error(f"Error cancelling Shiprocket order {order.shiprocket_order_id}: {str(e)}")
                             shiprocket_message = "Shipping system unavailable, but order will be cancelled locally"
                     
-                    # Update local order status
-                    order.status = 'cancelled'
-                    order.save()
-                    
-                    # Restore product quantities
-                    for item in order.items.all():
-                        item.product.quantity_available += item.quantity
-                        item.product.save()
+                    # Update local order status and restore product quantities
+                    order.cancel()
                     
                     # Create comprehensive status history
                     status_message = f"Order cancelled by customer. Reason: {reason}"
@@ -688,6 +698,27 @@ class PaymentStatusView(APIView):
             }, status=status.HTTP_404_NOT_FOUND)
 
 
+@dataclass(slots=True)
+class OrderStatisticsPayload:
+    """Shape of the order statistics response.
+
+    Money fields are Decimals so they encode as "123.45" strings, the same
+    format DRF's DecimalField produces everywhere else in the API.
+    """
+    total_orders: int
+    paid_orders: int
+    lifetime_revenue: Decimal
+    orders_today: int
+    orders_this_week: int
+    orders_this_month: int
+    revenue_today: Decimal
+    revenue_this_week: Decimal
+    revenue_this_month: Decimal
+    average_order_value: Decimal
+    status_breakdown: dict
+    top_products: list
+
+
 class OrderStatisticsView(APIView):
     """Get order statistics for dashboard"""
     
@@ -696,81 +727,89 @@ class OrderStatisticsView(APIView):
     def get(self, request):
         """Get user's order statistics"""
         user = request.user
-        now = timezone.now()
-        today = now.date()
-        week_start = today - timedelta(days=today.weekday())
-        month_start = today.replace(day=1)
+        today = timezone.localdate()
+        today_start = day_start(today)
+        tomorrow_start = today_start + timedelta(days=1)
+        week_start = day_start(today - timedelta(days=today.weekday()))
+        month_start = day_start(today.replace(day=1))
         
         # Base queryset for user's orders
         orders = Order.objects.filter(user=user)
         
         # Calculate statistics
         total_orders = orders.count()
-        orders_today = orders.filter(order_date__date=today).count()
-        orders_this_week = orders.filter(order_date__date__gte=week_start).count()
-        orders_this_month = orders.filter(order_date__date__gte=month_start).count()
+        orders_today = orders.filter(order_date__gte=today_start, order_date__lt=tomorrow_start).count()
+        orders_this_week = orders.filter(order_date__gte=week_start).count()
+        orders_this_month = orders.filter(order_date__gte=month_start).count()
         
         # Revenue calculations (only for completed payments)
         completed_orders = orders.filter(payment_status='completed')
         
         revenue_today = completed_orders.filter(
-            order_date__date=today
-        ).aggregate(total=Sum('total_amount'))['total'] or Decimal('0')
+            order_date__gte=today_start, order_date__lt=tomorrow_start
+        ).aggregate(total=Sum('total_amount'))['total']
         
         revenue_this_week = completed_orders.filter(
-            order_date__date__gte=week_start
-        ).aggregate(total=Sum('total_amount'))['total'] or Decimal('0')
+            order_date__gte=week_start
+        ).aggregate(total=Sum('total_amount'))['total']
         
         revenue_this_month = completed_orders.filter(
-            order_date__date__gte=month_start
-        ).aggregate(total=Sum('total_amount'))['total'] or Decimal('0')
+            order_date__gte=month_start
+        ).aggregate(total=Sum('total_amount'))['total']
         
         # Average order value
         avg_order_value = completed_orders.aggregate(
             avg=Avg('total_amount')
-        )['avg'] or Decimal('0')
+        )['avg']
         
-        # Status breakdown
-        status_breakdown = {}
-        for choice in Order._meta.get_field('status').choices:
-            status_key = choice[0]
-            status_breakdown[status_key] = orders.filter(status=status_key).count()
+        # Status breakdown in one grouped query
+        status_counts = dict(
+            orders.order_by().values_list('status').annotate(count=Count('id'))
+        )
+        status_breakdown = {
+            status_key: status_counts.get(status_key, 0)
+            for status_key, _ in Order._meta.get_field('status').choices
+        }
         
-        # Top products (from user's orders)
+        # Top products (from user's paid orders), read from the per-user
+        # totals maintained by Order.save() instead of grouping OrderItems
         top_products = []
-        product_stats = OrderItem.objects.filter(
-            order__user=user,
-            order__payment_status='completed'
-        ).values(
-            'product_name'
-        ).annotate(
-            orders_count=Count('order', distinct=True),
-            revenue=Sum('total_price')
-        ).order_by('-orders_count')[:5]
+        product_stats = UserProductStats.objects.filter(
+            user=user, orders_count__gt=0
+        ).order_by('-orders_count').values(
+            'product_name', 'orders_count', 'revenue'
+        )[:5]
         
         for product in product_stats:
             top_products.append({
                 'product_name': product['product_name'],
                 'orders_count': product['orders_count'],
-                'revenue': float(product['revenue'] or 0)
+                'revenue': as_float(product['revenue'])
             })
         
-        statistics = {
-            'total_orders': total_orders,
-            'orders_today': orders_today,
-            'orders_this_week': orders_this_week,
-            'orders_this_month': orders_this_month,
-            'revenue_today': float(revenue_today),
-            'revenue_this_week': float(revenue_this_week),
-            'revenue_this_month': float(revenue_this_month),
-            'average_order_value': float(avg_order_value),
-            'status_breakdown': status_breakdown,
-            'top_products': top_products
-        }
+        # Lifetime paid totals are kept as running counters by Order.save()
+        counters = UserOrderCounters.objects.filter(user=user).values(
+            'total_orders', 'lifetime_revenue'
+        ).first() or {'total_orders': 0, 'lifetime_revenue': Decimal('0')}
         
-        serializer = OrderStatisticsSerializer(statistics)
+        statistics = OrderStatisticsPayload(
+            total_orders=total_orders,
+            paid_orders=counters['total_orders'],
+            lifetime_revenue=as_money(counters['lifetime_revenue']),
+            orders_today=orders_today,
+            orders_this_week=orders_this_week,
+            orders_this_month=orders_this_month,
+            revenue_today=as_money(revenue_today),
+            revenue_this_week=as_money(revenue_this_week),
+            revenue_this_month=as_money(revenue_this_month),
+            average_order_value=as_money(avg_order_value),
+            status_breakdown=status_breakdown,
+            top_products=top_products
+        )
         
-        return Response({
-            'success': True,
-            'statistics': serializer.data
-        })
\ No newline at end of file
+        # Read-only, fixed-shape payload: encode directly with orjson instead
+        # of going through a serializer and the DRF renderer
+        return HttpResponse(
+            orjson.dumps({'success': True, 'statistics': asdict(statistics)}, default=str),
+            content_type='application/json'
+        )
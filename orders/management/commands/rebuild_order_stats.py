@@ -0,0 +1,30 @@
+"""
+Django management command to recompute the per-user order totals kept by Order.save().
+Usage: python manage.py rebuild_order_stats
+
+UserOrderCounters and UserProductStats are updated incrementally as payments
+complete or are reversed. Changes that bypass Order.save() (queryset .update(),
+raw SQL, restored backups) are not tracked; run this to bring the totals back
+in line with the orders.
+"""
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from orders.models import UserOrderCounters, UserProductStats
+
+
+class Command(BaseCommand):
+    help = 'Recompute per-user paid order counters and product totals from completed orders'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            UserOrderCounters.rebuild()
+            UserProductStats.rebuild()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Rebuilt order counters for {UserOrderCounters.objects.count()} user(s) '
+                f'and {UserProductStats.objects.count()} user product total(s)'
+            )
+        )
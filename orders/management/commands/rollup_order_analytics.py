@@ -0,0 +1,60 @@
+"""
+Django management command to materialize daily order statistics into OrderAnalytics.
+Usage: python manage.py rollup_order_analytics [--date YYYY-MM-DD] [--days N]
+
+Intended to run shortly after midnight (see render.yaml). By default it recomputes
+the ROLLUP_WINDOW_DAYS days up to and including yesterday, so payment and status
+changes to recent past orders reach the week/month figures read from these rows.
+"""
+
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from orders.models import OrderAnalytics
+
+# Long enough to cover the current month, the widest window the admin
+# analytics endpoint reads from rollups
+ROLLUP_WINDOW_DAYS = 31
+
+
+class Command(BaseCommand):
+    help = 'Roll up daily order statistics into OrderAnalytics rows'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--date',
+            type=str,
+            default=None,
+            help='Last day to roll up (YYYY-MM-DD). Defaults to yesterday.',
+        )
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=ROLLUP_WINDOW_DAYS,
+            help=f'Number of days to roll up, ending at --date (default {ROLLUP_WINDOW_DAYS})',
+        )
+
+    def handle(self, *args, **options):
+        if options['date']:
+            try:
+                end_date = datetime.strptime(options['date'], '%Y-%m-%d').date()
+            except ValueError:
+                raise CommandError('--date must be in YYYY-MM-DD format')
+        else:
+            end_date = timezone.localdate() - timedelta(days=1)
+
+        if options['days'] < 1:
+            raise CommandError('--days must be at least 1')
+
+        for offset in range(options['days'] - 1, -1, -1):
+            day = end_date - timedelta(days=offset)
+            analytics = OrderAnalytics.rollup(day)
+            self.stdout.write(
+                f'{day}: {analytics.total_orders} orders, revenue {analytics.total_revenue}'
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Rolled up {options["days"]} day(s) of order analytics')
+        )
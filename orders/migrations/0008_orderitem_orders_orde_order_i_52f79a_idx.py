@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-16 18:21
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0007_paymentmodecharge_order_payment_mode_charge'),
+        ('products', '0015_alter_product_min_order_quantity'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='orderitem',
+            index=models.Index(fields=['order', 'product'], name='orders_orde_order_i_52f79a_idx'),
+        ),
+    ]
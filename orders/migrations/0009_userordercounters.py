@@ -0,0 +1,57 @@
+# Generated by Django 5.2.18 on 2026-10-16 18:22
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_user_order_counters(apps, schema_editor):
+    Order = apps.get_model('orders', 'Order')
+    UserOrderCounters = apps.get_model('orders', 'UserOrderCounters')
+    from django.db.models import Count, Sum
+
+    totals = (
+        Order.objects
+        .filter(payment_status='completed')
+        .order_by()
+        .values('user_id')
+        .annotate(total_orders=Count('id'), lifetime_revenue=Sum('total_amount'))
+    )
+    UserOrderCounters.objects.bulk_create(
+        [
+            UserOrderCounters(
+                user_id=row['user_id'],
+                total_orders=row['total_orders'],
+                lifetime_revenue=row['lifetime_revenue'] or 0,
+            )
+            for row in totals
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0008_orderitem_orders_orde_order_i_52f79a_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserOrderCounters',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_orders', models.IntegerField(default=0, help_text='Number of orders with a completed payment')),
+                ('lifetime_revenue', models.DecimalField(decimal_places=2, default=Decimal('0.00'), help_text='Sum of completed order totals', max_digits=12)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.OneToOneField(help_text='Customer these counters belong to', on_delete=django.db.models.deletion.CASCADE, related_name='order_counters', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'User Order Counters',
+                'verbose_name_plural': 'User Order Counters',
+            },
+        ),
+        migrations.RunPython(backfill_user_order_counters, reverse_code=migrations.RunPython.noop),
+    ]
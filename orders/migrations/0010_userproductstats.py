@@ -0,0 +1,68 @@
+# Generated by Django 5.2.18 on 2026-10-16 18:24
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_user_product_stats(apps, schema_editor):
+    OrderItem = apps.get_model('orders', 'OrderItem')
+    UserProductStats = apps.get_model('orders', 'UserProductStats')
+    from django.db.models import Count, Max, Sum
+
+    totals = (
+        OrderItem.objects
+        .filter(order__payment_status='completed')
+        .order_by()
+        .values('order__user_id', 'product_id')
+        .annotate(
+            product_name=Max('product_name'),
+            orders_count=Count('order', distinct=True),
+            revenue=Sum('total_price'),
+        )
+    )
+    UserProductStats.objects.bulk_create(
+        [
+            UserProductStats(
+                user_id=row['order__user_id'],
+                product_id=row['product_id'],
+                product_name=row['product_name'],
+                orders_count=row['orders_count'],
+                revenue=row['revenue'] or 0,
+            )
+            for row in totals
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0009_userordercounters'),
+        ('products', '0016_product_primary_image_url'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserProductStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('product_name', models.CharField(help_text='Product name from the most recent paid order', max_length=255)),
+                ('orders_count', models.IntegerField(default=0, help_text='Number of paid orders containing this product')),
+                ('revenue', models.DecimalField(decimal_places=2, default=Decimal('0.00'), help_text='Sum of item totals in paid orders', max_digits=12)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('product', models.ForeignKey(help_text='Product ordered', on_delete=django.db.models.deletion.CASCADE, related_name='user_order_stats', to='products.product')),
+                ('user', models.ForeignKey(help_text='Customer these totals belong to', on_delete=django.db.models.deletion.CASCADE, related_name='product_order_stats', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'User Product Stats',
+                'verbose_name_plural': 'User Product Stats',
+                'indexes': [models.Index(fields=['user', '-orders_count'], name='user_product_stats_top_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'product'), name='unique_user_product_stats')],
+            },
+        ),
+        migrations.RunPython(backfill_user_product_stats, reverse_code=migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-16 18:27
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0010_userproductstats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(condition=models.Q(('payment_status', 'pending')), fields=['razorpay_order_id'], name='ord_rzp_oid_pending'),
+        ),
+    ]
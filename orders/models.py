@@ -1,9 +1,12 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth import get_user_model
-from django.db.models import JSONField
+from django.db.models import F, JSONField, OuterRef, Subquery, Sum
+from django.db.models.functions import Greatest
 from decimal import Decimal
+from datetime import timedelta
 import uuid
 from django.utils import timezone
+from kissanmart.dates import day_start
 
 User = get_user_model()
 
@@ -79,6 +82,30 @@ class DeliveryAddress(models.Model):
         return ", ".join(address_parts)
 
 
+class OrderQuerySet(models.QuerySet):
+    """Reusable query helpers for orders"""
+    
+    def with_item_totals(self):
+        """Annotate item count and total quantity used by ``items_count``/``total_quantity``"""
+        return self.annotate(
+            _items_count=models.Count('items'),
+            _total_quantity=models.Sum('items__quantity'),
+        )
+    
+    def without_payloads(self):
+        """Skip the large gateway/Shiprocket JSON columns that list views never read"""
+        return self.defer('payment_gateway_response', 'shiprocket_response', 'metadata')
+    
+    def with_full_details(self):
+        """Load the related rows used by the order detail serializers up front"""
+        return self.select_related(
+            'user', 'delivery_address', 'tracking', 'refund'
+        ).prefetch_related(
+            models.Prefetch('items', queryset=OrderItem.objects.select_related('seller', 'product')),
+            'status_history',
+        )
+
+
 class Order(models.Model):
     """Main Order model"""
     
@@ -148,10 +175,27 @@ class Order(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = OrderQuerySet.as_manager()
+    
     class Meta:
         ordering = ['-created_at']
         verbose_name = "Order"
         verbose_name_plural = "Orders"
+        indexes = [
+            # Webhook reconciliation only ever looks for orders still awaiting
+            # payment, so index just those rows
+            models.Index(
+                fields=['razorpay_order_id'],
+                condition=models.Q(payment_status='pending'),
+                name='ord_rzp_oid_pending'
+            ),
+        ]
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Remember the loaded payment status so save() can detect the transition
+        # to 'completed'. Read from __dict__ to avoid loading a deferred field.
+        self._original_payment_status = self.__dict__.get('payment_status')
     
     def save(self, *args, **kwargs):
         # Generate order ID if not provided
@@ -170,7 +214,60 @@ class Order(models.Model):
         if not self.total_amount:
             self.calculate_totals()
         
-        super().save(*args, **kwargs)
+        # +1 when the payment becomes completed, -1 when a completed payment is
+        # refunded/failed. An original status of None means payment_status was
+        # deferred on load, so the transition cannot be detected and the
+        # counters are left alone. Queryset .update() calls bypass save() and
+        # so never reach the counters either.
+        payment_delta = 0
+        if self._original_payment_status is not None:
+            was_completed = self._original_payment_status == 'completed'
+            is_completed = self.payment_status == 'completed'
+            payment_delta = int(is_completed) - int(was_completed)
+        
+        if payment_delta:
+            # The counters change in the same transaction as the order, so a
+            # failure part-way leaves neither updated
+            with transaction.atomic():
+                super().save(*args, **kwargs)
+                UserOrderCounters.record_payment_change(self.user_id, self.total_amount, payment_delta)
+                UserProductStats.record_payment_change(self, payment_delta)
+        else:
+            super().save(*args, **kwargs)
+        self._original_payment_status = self.payment_status
+    
+    def cancel(self):
+        """
+        Cancel the order and return its items' quantities to product stock
+        
+        The status is switched with a conditional UPDATE, so stock is restored
+        exactly once even if the order is cancelled twice concurrently.
+        
+        Returns:
+            bool: True if the order was cancelled now, False if it already was
+        """
+        with transaction.atomic():
+            now = timezone.now()
+            cancelled = Order.objects.filter(pk=self.pk).exclude(status='cancelled').update(
+                status='cancelled', updated_at=now
+            )
+            if cancelled:
+                # One UPDATE for the whole order: each product gets back the summed
+                # quantity of this order's items for it (correlated subquery)
+                from products.models import Product
+                order_items = OrderItem.objects.filter(order_id=self.pk)
+                restore_quantity = order_items.filter(
+                    product_id=OuterRef('pk')
+                ).values('product_id').annotate(total=Sum('quantity')).values('total')
+                
+                Product.objects.filter(
+                    id__in=order_items.values('product_id')
+                ).update(quantity_available=F('quantity_available') + Subquery(restore_quantity))
+        
+        self.status = 'cancelled'
+        if cancelled:
+            self.updated_at = now
+        return bool(cancelled)
     
     def __str__(self):
         return f"Order {self.id} - {self.customer_name} ({self.status})"
@@ -180,19 +277,19 @@ class Order(models.Model):
         """Generate unique order ID"""
         import random
         import string
-        from django.db import transaction
         
-        with transaction.atomic():
-            while True:
-                # Generate ID like KC123456
-                order_id = 'KC' + ''.join(random.choices(string.digits, k=6))
-                if not Order.objects.filter(id=order_id).exists():
-                    return order_id
+        # The primary key constraint is what guarantees uniqueness; the
+        # existence check only avoids most collisions up front, so it does
+        # not need its own transaction/savepoint.
+        while True:
+            # Generate ID like KC123456
+            order_id = 'KC' + ''.join(random.choices(string.digits, k=6))
+            if not Order.objects.filter(id=order_id).exists():
+                return order_id
     
     def calculate_totals(self):
         """Calculate order totals from items"""
-        items = self.items.all()
-        self.subtotal = sum(item.total_price for item in items)
+        self.subtotal = self.items.aggregate(total=models.Sum('total_price'))['total'] or Decimal('0.00')
         
         # Calculate shipping (free for orders above 500)
         self.shipping_charges = Decimal('0.00') if self.subtotal > 500 else Decimal('50.00')
@@ -216,12 +313,21 @@ class Order(models.Model):
     @property
     def items_count(self):
         """Get total number of items in order"""
+        # Reuse the with_item_totals() annotation when present
+        if hasattr(self, '_items_count'):
+            return self._items_count
         return self.items.count()
     
     @property
     def total_quantity(self):
         """Get total quantity of all items"""
-        return sum(item.quantity for item in self.items.all())
+        # Reuse the with_item_totals() annotation or prefetched items when
+        # available, otherwise sum in the database
+        if hasattr(self, '_total_quantity'):
+            return self._total_quantity or Decimal('0')
+        if 'items' in getattr(self, '_prefetched_objects_cache', {}):
+            return sum(item.quantity for item in self.items.all())
+        return self.items.aggregate(total=models.Sum('quantity'))['total'] or Decimal('0')
     
     @property
     def can_be_cancelled(self):
@@ -288,6 +394,22 @@ class OrderItem(models.Model):
         verbose_name = "Order Item"
         verbose_name_plural = "Order Items"
         ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['order', 'product']),
+        ]
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the loaded quantity so the pre_save stock handler can diff
+        # against it without re-reading the row (None if it was deferred)
+        instance._loaded_quantity = instance.__dict__.get('quantity')
+        return instance
+    
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+        if fields is None or 'quantity' in fields:
+            self._loaded_quantity = self.__dict__.get('quantity')
     
     def save(self, *args, **kwargs):
         # Set product details from product if not provided
@@ -297,23 +419,9 @@ class OrderItem(models.Model):
             if not self.unit_price:
                 self.unit_price = self.product.price_per_unit
         
-        # Set product image from primary image or first available image
+        # Set product image from the product's denormalized primary image URL
         if self.product and not self.product_image:
-            # Try to get primary image first
-            primary_image = self.product.images.filter(is_primary=True).first()
-            if primary_image:
-                if primary_image.image:
-                    self.product_image = primary_image.image.url
-                elif primary_image.url:
-                    self.product_image = primary_image.url
-            else:
-                # Get first available image if no primary image
-                first_image = self.product.images.first()
-                if first_image:
-                    if first_image.image:
-                        self.product_image = first_image.image.url
-                    elif first_image.url:
-                        self.product_image = first_image.url
+            self.product_image = self.product.primary_image_url or None
         
         # Set seller details
         if self.product:
@@ -336,26 +444,71 @@ class OrderItem(models.Model):
         
         # Set farm details
         if self.product and not self.farm_details:
-            # Product model does not have a `state` field. Use available location fields
-            # (city and pincode) to build a farm_location string. Fall back to an empty string
-            # if city is not provided.
-            city = self.product.city or ''
-            pincode = self.product.pincode or ''
-            location_parts = [part for part in [city, pincode] if part]
-            farm_location = ', '.join(location_parts) if location_parts else ''
-
-            self.farm_details = {
-                'farm_location': farm_location,
-                'coordinates': {
-                    'latitude': float(self.product.latitude) if self.product.latitude else None,
-                    'longitude': float(self.product.longitude) if self.product.longitude else None,
-                }
-            }
+            self.farm_details = self._farm_details_for(self.product)
         
         super().save(*args, **kwargs)
     
     def __str__(self):
         return f"{self.quantity} x {self.product_name} in Order {self.order.id}"
+    
+    @staticmethod
+    def _farm_details_for(product):
+        """Build the farm traceability details for a product"""
+        # Product model does not have a `state` field. Use available location fields
+        # (city and pincode) to build a farm_location string. Fall back to an empty string
+        # if city is not provided.
+        city = product.city or ''
+        pincode = product.pincode or ''
+        location_parts = [part for part in [city, pincode] if part]
+        farm_location = ', '.join(location_parts) if location_parts else ''
+
+        return {
+            'farm_location': farm_location,
+            'coordinates': {
+                'latitude': float(product.latitude) if product.latitude else None,
+                'longitude': float(product.longitude) if product.longitude else None,
+            }
+        }
+    
+    @classmethod
+    def bulk_create_for_order(cls, order, product_qty_pairs, unit_prices=None):
+        """Create all items of an order with a single INSERT.
+
+        ``product_qty_pairs`` is an iterable of ``(product, quantity)`` where
+        product may be a Product instance or its primary key. ``unit_prices``
+        optionally maps product id to the agreed unit price; the product's
+        current price is used otherwise.
+
+        Products are fetched once with their seller, so the per-item lookups
+        done in ``save()`` are resolved in memory. ``save()`` and the
+        OrderItem signals are skipped, so callers are responsible for
+        adjusting product stock.
+        """
+        from products.models import Product
+
+        unit_prices = unit_prices or {}
+        pairs = [(getattr(product, 'pk', product), quantity) for product, quantity in product_qty_pairs]
+        products = Product.objects.select_related('seller').in_bulk([product_id for product_id, _ in pairs])
+
+        items = []
+        for product_id, quantity in pairs:
+            product = products[product_id]
+            unit_price = unit_prices.get(product_id) or product.price_per_unit
+            items.append(cls(
+                order=order,
+                product=product,
+                product_name=product.title,
+                product_image=product.primary_image_url or None,
+                seller=product.seller,
+                seller_name=product.seller.full_name,
+                quantity=quantity,
+                unit=product.unit,
+                unit_price=unit_price,
+                total_price=quantity * unit_price,
+                farm_details=cls._farm_details_for(product),
+            ))
+
+        return cls.objects.bulk_create(items)
 
 
 class OrderTracking(models.Model):
@@ -431,6 +584,151 @@ class OrderStatusHistory(models.Model):
     def __str__(self):
         return f"Order {self.order.id} - {self.status} at {self.timestamp}"
 
+class UserOrderCounters(models.Model):
+    """Running per-user totals of paid orders, kept current by Order.save()"""
+    
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='order_counters', help_text="Customer these counters belong to")
+    total_orders = models.IntegerField(default=0, help_text="Number of orders with a completed payment")
+    lifetime_revenue = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'), help_text="Sum of completed order totals")
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = "User Order Counters"
+        verbose_name_plural = "User Order Counters"
+    
+    def __str__(self):
+        return f"Counters for user {self.user_id} - {self.total_orders} paid orders"
+    
+    @classmethod
+    def record_payment_change(cls, user_id, amount, delta):
+        """Atomically add (``delta=1``) or remove (``delta=-1``) one paid order of ``amount``
+
+        Counters never go below zero, even if they had drifted below the
+        orders being removed.
+        """
+        increments = {
+            'total_orders': Greatest(models.F('total_orders') + delta, 0),
+            'lifetime_revenue': Greatest(models.F('lifetime_revenue') + amount * delta, Decimal('0.00')),
+        }
+        if cls.objects.filter(user_id=user_id).update(**increments):
+            return
+        _, created = cls.objects.get_or_create(
+            user_id=user_id,
+            defaults={'total_orders': max(delta, 0), 'lifetime_revenue': max(amount * delta, Decimal('0.00'))}
+        )
+        if not created:
+            # Another request created the row between the update and the insert
+            cls.objects.filter(user_id=user_id).update(**increments)
+    
+    @classmethod
+    def rebuild(cls):
+        """Recompute every user's counters from the orders with a completed payment"""
+        totals = (
+            Order.objects
+            .filter(payment_status='completed')
+            .order_by()
+            .values('user_id')
+            .annotate(total_orders=models.Count('id'), lifetime_revenue=Sum('total_amount'))
+        )
+        with transaction.atomic():
+            cls.objects.all().delete()
+            cls.objects.bulk_create(
+                [
+                    cls(
+                        user_id=row['user_id'],
+                        total_orders=row['total_orders'],
+                        lifetime_revenue=row['lifetime_revenue'] or Decimal('0.00'),
+                    )
+                    for row in totals
+                ],
+                batch_size=500,
+            )
+
+
+class UserProductStats(models.Model):
+    """Per-user, per-product totals over paid orders, used for the top products
+    on the order statistics dashboard. Kept current by Order.save()."""
+    
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='product_order_stats', help_text="Customer these totals belong to")
+    product = models.ForeignKey('products.Product', on_delete=models.CASCADE, related_name='user_order_stats', help_text="Product ordered")
+    product_name = models.CharField(max_length=255, help_text="Product name from the most recent paid order")
+    orders_count = models.IntegerField(default=0, help_text="Number of paid orders containing this product")
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'), help_text="Sum of item totals in paid orders")
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = "User Product Stats"
+        verbose_name_plural = "User Product Stats"
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'product'], name='unique_user_product_stats'),
+        ]
+        indexes = [
+            models.Index(fields=['user', '-orders_count'], name='user_product_stats_top_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.product_name} for user {self.user_id} - {self.orders_count} orders"
+    
+    @classmethod
+    def record_payment_change(cls, order, delta):
+        """Add (``delta=1``) or remove (``delta=-1``) an order's items from the user's product totals
+
+        Totals never go below zero, even if they had drifted below the order
+        being removed.
+        """
+        item_totals = list(
+            order.items.order_by().values('product_id').annotate(
+                product_name=models.Max('product_name'),
+                revenue=models.Sum('total_price')
+            )
+        )
+        if not item_totals:
+            return
+        if delta > 0:
+            # Make sure a row exists for every product, then increment in place
+            cls.objects.bulk_create(
+                [cls(user_id=order.user_id, product_id=row['product_id'], product_name=row['product_name'])
+                 for row in item_totals],
+                ignore_conflicts=True
+            )
+        for row in item_totals:
+            cls.objects.filter(user_id=order.user_id, product_id=row['product_id']).update(
+                product_name=row['product_name'],
+                orders_count=Greatest(models.F('orders_count') + delta, 0),
+                revenue=Greatest(models.F('revenue') + (row['revenue'] or Decimal('0.00')) * delta, Decimal('0.00')),
+            )
+    
+    @classmethod
+    def rebuild(cls):
+        """Recompute every user's product totals from the orders with a completed payment"""
+        totals = (
+            OrderItem.objects
+            .filter(order__payment_status='completed')
+            .order_by()
+            .values('order__user_id', 'product_id')
+            .annotate(
+                product_name=models.Max('product_name'),
+                orders_count=models.Count('order', distinct=True),
+                revenue=Sum('total_price'),
+            )
+        )
+        with transaction.atomic():
+            cls.objects.all().delete()
+            cls.objects.bulk_create(
+                [
+                    cls(
+                        user_id=row['order__user_id'],
+                        product_id=row['product_id'],
+                        product_name=row['product_name'],
+                        orders_count=row['orders_count'],
+                        revenue=row['revenue'] or Decimal('0.00'),
+                    )
+                    for row in totals
+                ],
+                batch_size=500,
+            )
+
+
 class PaymentModeCharge(models.Model):
     """Admin-configurable percentage charge per payment mode.
 
@@ -658,3 +956,82 @@ class OrderAnalytics(models.Model):
     
     def __str__(self):
         return f"Analytics for {self.date} - {self.total_orders} orders"
+    
+    @classmethod
+    def rollup(cls, date):
+        """Compute and store the analytics row for a single day.
+
+        Revenue only counts orders with a completed payment, matching the
+        admin analytics endpoint. Re-running for the same date overwrites
+        the existing row.
+        """
+        start = day_start(date)
+        day_orders = Order.objects.filter(order_date__gte=start, order_date__lt=start + timedelta(days=1))
+        completed = models.Q(payment_status='completed')
+        
+        totals = day_orders.aggregate(
+            total_orders=models.Count('id'),
+            pending_orders=models.Count('id', filter=models.Q(status='pending')),
+            confirmed_orders=models.Count('id', filter=models.Q(status='confirmed')),
+            delivered_orders=models.Count('id', filter=models.Q(status='delivered')),
+            cancelled_orders=models.Count('id', filter=models.Q(status='cancelled')),
+            completed_orders=models.Count('id', filter=completed),
+            total_revenue=models.Sum('total_amount', filter=completed),
+        )
+        completed_orders = totals.pop('completed_orders')
+        total_revenue = totals.pop('total_revenue') or Decimal('0.00')
+        average_order_value = (total_revenue / completed_orders).quantize(Decimal('0.01')) if completed_orders else Decimal('0.00')
+        
+        completed_items = OrderItem.objects.filter(order__in=day_orders.filter(completed))
+        top_products = [
+            {
+                'product_id': product['product_id'],
+                'product_name': product['product_name'],
+                'orders_count': product['orders_count'],
+                'revenue': float(product['revenue'] or 0),
+                'quantity_sold': float(product['quantity_sold'] or 0)
+            }
+            for product in completed_items.values('product_id', 'product_name').annotate(
+                orders_count=models.Count('order', distinct=True),
+                revenue=models.Sum('total_price'),
+                quantity_sold=models.Sum('quantity')
+            ).order_by('-revenue')[:10]
+        ]
+        top_sellers = [
+            {
+                'seller_id': seller['seller_id'],
+                'seller_name': seller['seller__full_name'],
+                'orders_count': seller['orders_count'],
+                'revenue': float(seller['revenue'] or 0),
+                'items_sold': seller['items_sold']
+            }
+            for seller in completed_items.values('seller_id', 'seller__full_name').annotate(
+                orders_count=models.Count('order', distinct=True),
+                revenue=models.Sum('total_price'),
+                items_sold=models.Count('id')
+            ).order_by('-revenue')[:10]
+        ]
+        top_cities = [
+            {
+                'city': city['delivery_address__city'],
+                'orders_count': city['orders_count'],
+                'revenue': float(city['revenue'] or 0)
+            }
+            for city in day_orders.filter(completed).values('delivery_address__city').annotate(
+                orders_count=models.Count('id'),
+                revenue=models.Sum('total_amount')
+            ).order_by('-orders_count')[:10]
+        ]
+        
+        analytics, _ = cls.objects.update_or_create(
+            date=date,
+            defaults={
+                **totals,
+                'total_revenue': total_revenue,
+                'average_order_value': average_order_value,
+                'top_products': top_products,
+                'top_sellers': top_sellers,
+                'top_cities': top_cities,
+            }
+        )
+        return analytics
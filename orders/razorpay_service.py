@@ -3,30 +3,94 @@ Razorpay payment service for handling payment gateway operations
 """
 
 import razorpay
+import requests
+from requests.adapters import HTTPAdapter
 import hmac
-import hashlib
+import functools
 from django.conf import settings
-from decimal import Decimal
+from decimal import Decimal, ROUND_HALF_UP
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Encoded once at import; used as the HMAC key for every signature check
+_SECRET_BYTES = settings.RAZORPAY_KEY_SECRET.encode('utf-8')
+
+
+class _InvalidSignature(Exception):
+    """Raised by _check_signature on mismatch so failures are never memoized"""
+
+
+@functools.lru_cache(maxsize=2048)
+def _check_signature(razorpay_order_id, razorpay_payment_id, razorpay_signature):
+    """
+    HMAC-check a payment signature, remembering successful checks.
+    
+    Client double-submits and webhook retries verify the same triple again;
+    those hits skip the HMAC. lru_cache does not store exceptions, so only
+    valid signatures end up in the cache.
+    """
+    # Generate expected signature (raw 32-byte digest) over "order_id|payment_id",
+    # assembled directly as bytes
+    body = b'%b|%b' % (razorpay_order_id.encode('utf-8'), razorpay_payment_id.encode('utf-8'))
+    expected_signature = hmac.digest(_SECRET_BYTES, body, 'sha256')
+    
+    # Compare against the decoded hex signature; anything that is not
+    # valid hex cannot be a genuine signature
+    try:
+        received_signature = bytes.fromhex(razorpay_signature)
+    except ValueError:
+        received_signature = b''
+    if not hmac.compare_digest(expected_signature, received_signature):
+        raise _InvalidSignature
+    return True
+
 
 class RazorpayService:
     """Service class for Razorpay payment gateway operations"""
     
     def __init__(self):
         """Initialize Razorpay client with API credentials"""
+        # Pooled session so repeated API calls reuse keep-alive connections to
+        # api.razorpay.com instead of doing a fresh TLS handshake each time
+        session = requests.Session()
+        session.mount('https://', HTTPAdapter(pool_connections=10, pool_maxsize=20))
         self.client = razorpay.Client(
+            session=session,
             auth=(settings.RAZORPAY_KEY_ID, settings.RAZORPAY_KEY_SECRET)
         )
     
+    @staticmethod
+    def _safe_call(action, result_key, call):
+        """
+        Run a Razorpay API call and wrap its outcome in the service's result dict
+        
+        Args:
+            action (str): What is being done, used in the error log (e.g. "creating refund")
+            result_key (str): Key the successful result is returned under
+            call (callable): Performs the API call and returns its result
+            
+        Returns:
+            dict: {'success': True, result_key: result} or {'success': False, 'error': message}
+        """
+        try:
+            return {
+                'success': True,
+                result_key: call()
+            }
+        except Exception as e:
+            logger.error("Error %s: %s", action, e)
+            return {
+                'success': False,
+                'error': str(e)
+            }
+    
     def create_order(self, amount, currency='INR', receipt=None, notes=None):
         """
         Create a Razorpay order
         
         Args:
-            amount (Decimal): Order amount in the smallest currency unit (paise for INR)
+            amount (Decimal): Order amount in rupees; converted to paise, rounding half up
             currency (str): Currency code (default: INR)
             receipt (str): Receipt ID for tracking
             notes (dict): Additional notes/metadata
@@ -34,9 +98,11 @@ class RazorpayService:
         Returns:
             dict: Razorpay order response
         """
-        try:
-            # Convert amount to paise (smallest unit for INR)
-            amount_in_paise = int(amount * 100)
+        def create():
+            # Convert amount to paise (smallest unit for INR). scaleb shifts the
+            # exponent instead of multiplying, and sub-paise values round half up
+            # rather than being truncated by int()
+            amount_in_paise = int(Decimal(amount).scaleb(2).to_integral_value(rounding=ROUND_HALF_UP))
             
             order_data = {
                 'amount': amount_in_paise,
@@ -50,23 +116,14 @@ class RazorpayService:
             if notes:
                 order_data['notes'] = notes
             
-            logger.info(f"Creating Razorpay order with data: {order_data}")
+            logger.info("Creating Razorpay order with data: %s", order_data)
             
             order = self.client.order.create(data=order_data)
             
-            logger.info(f"Razorpay order created successfully: {order['id']}")
-            
-            return {
-                'success': True,
-                'order': order
-            }
-            
-        except Exception as e:
-            logger.error(f"Error creating Razorpay order: {str(e)}")
-            return {
-                'success': False,
-                'error': str(e)
-            }
+            logger.info("Razorpay order created successfully: %s", order['id'])
+            return order
+        
+        return self._safe_call('creating Razorpay order', 'order', create)
     
     def verify_payment_signature(self, razorpay_order_id, razorpay_payment_id, razorpay_signature):
         """
@@ -81,26 +138,25 @@ class RazorpayService:
             bool: True if signature is valid, False otherwise
         """
         try:
-            # Generate expected signature
-            body = razorpay_order_id + "|" + razorpay_payment_id
-            expected_signature = hmac.new(
-                key=settings.RAZORPAY_KEY_SECRET.encode('utf-8'),
-                msg=body.encode('utf-8'),
-                digestmod=hashlib.sha256
-            ).hexdigest()
-            
-            # Compare signatures
-            is_valid = hmac.compare_digest(expected_signature, razorpay_signature)
+            # A SHA-256 hex signature is always 64 characters; rejecting other
+            # lengths up front reveals nothing about the expected value
+            if not razorpay_signature or len(razorpay_signature) != 64:
+                is_valid = False
+            else:
+                try:
+                    is_valid = _check_signature(razorpay_order_id, razorpay_payment_id, razorpay_signature)
+                except _InvalidSignature:
+                    is_valid = False
             
             if is_valid:
-                logger.info(f"Payment signature verified successfully for order: {razorpay_order_id}")
+                logger.info("Payment signature verified successfully for order: %s", razorpay_order_id)
             else:
-                logger.warning(f"Payment signature verification failed for order: {razorpay_order_id}")
+                logger.warning("Payment signature verification failed for order: %s", razorpay_order_id)
             
             return is_valid
             
         except Exception as e:
-            logger.error(f"Error verifying payment signature: {str(e)}")
+            logger.error("Error verifying payment signature: %s", e)
             return False
     
     def fetch_payment(self, payment_id):
@@ -113,32 +169,22 @@ class RazorpayService:
         Returns:
             dict: Payment details or error
         """
-        try:
+        def fetch():
             payment = self.client.payment.fetch(payment_id)
             
-            logger.info(f"Payment details fetched successfully: {payment_id}")
-            logger.debug(f"Raw payment response: {payment}")
+            logger.info("Payment details fetched successfully: %s", payment_id)
+            logger.debug("Raw payment response: %s", payment)
             
+            # The SDK returns a plain dict; only probe other shapes when it doesn't
+            if isinstance(payment, dict):
+                return payment
             # Ensure the payment object is JSON serializable
-            if hasattr(payment, 'json'):
-                payment_data = payment.json()
-            elif isinstance(payment, dict):
-                payment_data = payment
-            else:
-                # Convert to dict if it's a different type
-                payment_data = dict(payment) if hasattr(payment, '__iter__') else {'raw_response': str(payment)}
-            
-            return {
-                'success': True,
-                'payment': payment_data
-            }
-            
-        except Exception as e:
-            logger.error(f"Error fetching payment details: {str(e)}")
-            return {
-                'success': False,
-                'error': str(e)
-            }
+            if callable(getattr(payment, 'json', None)):
+                return payment.json()
+            # Convert to dict if it's a different type
+            return dict(payment) if hasattr(payment, '__iter__') else {'raw_response': str(payment)}
+        
+        return self._safe_call('fetching payment details', 'payment', fetch)
     
     def refund_payment(self, payment_id, amount=None, notes=None):
         """
@@ -152,7 +198,7 @@ class RazorpayService:
         Returns:
             dict: Refund response or error
         """
-        try:
+        def refund():
             refund_data = {}
             
             if amount:
@@ -163,19 +209,10 @@ class RazorpayService:
             
             refund = self.client.payment.refund(payment_id, refund_data)
             
-            logger.info(f"Refund created successfully: {refund['id']}")
-            
-            return {
-                'success': True,
-                'refund': refund
-            }
-            
-        except Exception as e:
-            logger.error(f"Error creating refund: {str(e)}")
-            return {
-                'success': False,
-                'error': str(e)
-            }
+            logger.info("Refund created successfully: %s", refund['id'])
+            return refund
+        
+        return self._safe_call('creating refund', 'refund', refund)
     
     @staticmethod
     def calculate_razorpay_fee(amount, payment_method='card'):
@@ -248,7 +285,7 @@ class RazorpayService:
         Returns:
             dict: Capture response or error
         """
-        try:
+        def capture():
             capture_data = {
                 'amount': amount,
                 'currency': 'INR'
@@ -256,16 +293,20 @@ class RazorpayService:
             
             payment = self.client.payment.capture(payment_id, capture_data)
             
-            logger.info(f"Payment captured successfully: {payment_id}")
-            
-            return {
-                'success': True,
-                'payment': payment
-            }
-            
-        except Exception as e:
-            logger.error(f"Error capturing payment: {str(e)}")
-            return {
-                'success': False,
-                'error': str(e)
-            }
\ No newline at end of file
+            logger.info("Payment captured successfully: %s", payment_id)
+            return payment
+        
+        return self._safe_call('capturing payment', 'payment', capture)
+
+
+# Singleton instance with lazy initialization
+_razorpay_service_instance = None
+
+def get_razorpay_service():
+    """
+    Get the shared Razorpay service instance with lazy initialization
+    """
+    global _razorpay_service_instance
+    if _razorpay_service_instance is None:
+        _razorpay_service_instance = RazorpayService()
+    return _razorpay_service_instance
@@ -2,6 +2,12 @@ from rest_framework import serializers
 from ..models import Product, ProductImage
 from users.models import CustomUser
 from django.utils import timezone
+from django.utils.functional import cached_property
+
+
+def _text(value):
+    """CharField output: str(value), keeping None as None"""
+    return None if value is None else str(value)
 
 
 class AdminProductSellerSerializer(serializers.ModelSerializer):
@@ -28,6 +34,27 @@ class AdminProductSellerSerializer(serializers.ModelSerializer):
             'isActive', 'joinedAt', 'lastUpdated'
         ]
 
+    def to_representation(self, instance):
+        # Mapped by hand: this runs once per row on the admin list pages, where
+        # dispatching through each declared field dominated serialization time.
+        # Keep in step with Meta.fields, which still drives the API schema.
+        fields = self.fields
+        return {
+            'userId': str(instance.id),
+            'fullName': _text(instance.full_name),
+            'mobileNumber': _text(instance.mobile_number),
+            'userType': _text(instance.user_type),
+            'city': _text(instance.city),
+            'state': _text(instance.state),
+            'pincode': _text(instance.pincode),
+            'registrationMethod': _text(instance.registration_method),
+            'isMobileVerified': bool(instance.is_mobile_verified),
+            'isProfileComplete': bool(instance.is_profile_complete),
+            'isActive': bool(instance.is_active),
+            'joinedAt': fields['joinedAt'].to_representation(instance.created_at) if instance.created_at else None,
+            'lastUpdated': fields['lastUpdated'].to_representation(instance.updated_at) if instance.updated_at else None,
+        }
+
 
 class AdminProductImageSerializer(serializers.ModelSerializer):
     """Serializer for product images in admin views"""
@@ -37,11 +64,25 @@ class AdminProductImageSerializer(serializers.ModelSerializer):
         model = ProductImage
         fields = ['id', 'imageUrl', 'url', 'is_primary', 'caption']
     
+    def to_representation(self, instance):
+        # Mapped by hand like AdminProductSellerSerializer; keep in step with Meta.fields
+        return {
+            'id': instance.id,
+            'imageUrl': self.get_imageUrl(instance),
+            'url': _text(instance.url),
+            'is_primary': bool(instance.is_primary),
+            'caption': _text(instance.caption),
+        }
+    
     def get_imageUrl(self, obj):
         if obj.url:
             return obj.url
+        name = obj.image.name if obj.image else None
+        if not name:
+            return None
         try:
-            return obj.image.url if obj.image else None
+            # Ask the storage backend directly instead of going through FieldFile.url
+            return obj.image.storage.url(name)
         except Exception:
             return None
 
@@ -66,7 +107,7 @@ class AdminProductListSerializer(serializers.ModelSerializer):
     totalValue = serializers.DecimalField(source='total_value', max_digits=15, decimal_places=2, read_only=True)
     
     # Location
-    location = serializers.SerializerMethodField()
+    location = serializers.DictField(source='location_dict', read_only=True)
     
     # Status and visibility
     status = serializers.CharField(read_only=True)
@@ -92,16 +133,40 @@ class AdminProductListSerializer(serializers.ModelSerializer):
             'uploadedAt', 'lastUpdated', 'daysListed', 'pexelsImageUrl'
         ]
 
-    def get_location(self, obj):
-        if obj.latitude is None or obj.longitude is None:
-            return None
+    def to_representation(self, instance):
+        # Mapped by hand: the list endpoints serialize whole pages of products and
+        # dispatching through each declared field dominated their response time.
+        # Keep in step with Meta.fields, which still drives the API schema.
+        fields = self.fields
+        total_value = instance.total_value
         return {
-            'latitude': float(obj.latitude) if obj.latitude else None,
-            'longitude': float(obj.longitude) if obj.longitude else None,
-            'city': obj.city,
-            'pincode': obj.pincode
+            'productId': str(instance.uuid),
+            'seller': fields['seller'].to_representation(instance.seller) if instance.seller else None,
+            'title': _text(instance.title),
+            'category': self.get_category(instance),
+            'crop': _text(instance.crop),
+            'variety': _text(instance.variety),
+            'grade': _text(instance.grade),
+            'availableQuantity': fields['availableQuantity'].to_representation(instance.quantity_available) if instance.quantity_available is not None else None,
+            'quantityUnit': self.get_quantityUnit(instance),
+            'pricePerUnit': fields['pricePerUnit'].to_representation(instance.price_per_unit) if instance.price_per_unit is not None else None,
+            'totalValue': fields['totalValue'].to_representation(total_value) if total_value is not None else None,
+            'location': instance.location_dict,
+            'status': instance.status,
+            'isPublished': bool(instance.is_published),
+            'targetBuyers': instance.target_buyers_display,
+            'primaryImage': self.get_primaryImage(instance),
+            'uploadedAt': fields['uploadedAt'].to_representation(instance.created_at) if instance.created_at else None,
+            'lastUpdated': fields['lastUpdated'].to_representation(instance.updated_at) if instance.updated_at else None,
+            'daysListed': self.get_daysListed(instance),
+            'pexelsImageUrl': _text(instance.pexels_image_url),
         }
 
+    @cached_property
+    def image_serializer(self):
+        """One image serializer reused for every row's primary image"""
+        return AdminProductImageSerializer()
+
     def get_quantityUnit(self, obj):
         try:
             u = getattr(obj, 'unit', None)
@@ -114,23 +179,35 @@ class AdminProductListSerializer(serializers.ModelSerializer):
             return getattr(obj, 'unit', None)
 
     def get_primaryImage(self, obj):
-        primary_image = obj.images.filter(is_primary=True).first()
-        if not primary_image:
-            primary_image = obj.images.first()
+        listing_images = getattr(obj, 'listing_images', None)
+        if listing_images is not None:
+            # Already narrowed to the primary (else first) image by the listing prefetch
+            return self.image_serializer.to_representation(listing_images[0]) if listing_images else None
+        # Scan the prefetched images in memory instead of querying per product
+        images = obj.images.all()
+        primary_image = next((image for image in images if image.is_primary), None)
+        if not primary_image and images:
+            primary_image = images[0]
         
         if primary_image:
-            return AdminProductImageSerializer(primary_image).data
+            return self.image_serializer.to_representation(primary_image)
         return None
 
     def get_category(self, obj):
         """Get category name from ForeignKey relationship"""
         return obj.category.name if obj.category else None
     
+    # daysListed is computed here rather than annotated in SQL so the serializer
+    # works on any Product queryset, including the streamed listing's
+    @cached_property
+    def listing_reference_time(self):
+        """Current time, read once per serializer so every row shares it"""
+        return timezone.now()
+
     def get_daysListed(self, obj):
         """Calculate how many days the product has been listed"""
         if obj.created_at:
-            delta = timezone.now() - obj.created_at
-            return delta.days
+            return (self.listing_reference_time - obj.created_at).days
         return 0
 
 
@@ -163,7 +240,7 @@ class AdminProductDetailSerializer(serializers.ModelSerializer):
     location = serializers.SerializerMethodField()
     
     # Target buyers
-    targetBuyers = serializers.SerializerMethodField()
+    targetBuyers = serializers.ListField(source='target_buyer_list', read_only=True)
     buyerCategoryVisibility = serializers.JSONField(source='buyer_category_visibility', read_only=True)
     
     # Images  
@@ -202,35 +279,8 @@ class AdminProductDetailSerializer(serializers.ModelSerializer):
             'address': obj.seller.address if obj.seller else None
         }
 
-    def get_targetBuyers(self, obj):
-        targets = []
-        if obj.target_mandi_owners:
-            targets.append({
-                'type': 'mandi_owner',
-                'displayName': 'Mandi Owners',
-                'enabled': True
-            })
-        if obj.target_shopkeepers:
-            targets.append({
-                'type': 'shopkeeper', 
-                'displayName': 'Shopkeepers',
-                'enabled': True
-            })
-        if obj.target_communities:
-            targets.append({
-                'type': 'community',
-                'displayName': 'Communities',
-                'enabled': True
-            })
-        
-        return targets if targets else [{
-            'type': 'all',
-            'displayName': 'All Buyers',
-            'enabled': True
-        }]
-
     def get_totalImages(self, obj):
-        return obj.images.count()
+        return len(obj.images.all())
 
     def get_category(self, obj):
         """Get category name from ForeignKey relationship"""
@@ -267,5 +317,6 @@ class AdminProductUpdateSerializer(serializers.ModelSerializer):
     def update(self, instance, validated_data):
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
-        instance.save()
+        # Write only the patched columns (plus the auto_now timestamp)
+        instance.save(update_fields=[*validated_data, 'updated_at'])
         return instance
\ No newline at end of file
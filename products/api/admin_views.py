@@ -3,11 +3,23 @@ from rest_framework import status, generics
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
 from django.conf import settings
+from django.http import StreamingHttpResponse
+from rest_framework.utils.encoders import JSONEncoder
+from django.core.cache import cache
 from django.shortcuts import get_object_or_404
-from django.db.models import Q, Sum, Avg, Count
+from django.db import connection
+from django.db.models import F, Q, Sum, Avg, Count, Prefetch
+from django.middleware.http import ConditionalGetMiddleware
+from django.utils.cache import patch_cache_control
+from django.utils.decorators import decorator_from_middleware, method_decorator
+from django.contrib.postgres.search import SearchQuery, SearchRank
 from django.utils import timezone
-from datetime import timedelta
+from datetime import date, datetime, timedelta
+from decimal import Decimal
 import base64
+import functools
+import hmac
+import json
 try:
     from drf_spectacular.utils import extend_schema, OpenApiParameter
     from drf_spectacular.types import OpenApiTypes
@@ -31,8 +43,10 @@ except ImportError:
     
     HAS_SPECTACULAR = False
 
-from ..models import Product, ProductImage
-from users.models import CustomUser, AdminActionLog
+from ..models import Category, Product, ProductImage, PRODUCT_SEARCH_VECTOR
+from users.models import CustomUser
+from users.action_logs import log_admin_action
+from kissanmart.dates import day_start
 from .admin_serializers import (
     AdminProductListSerializer, 
     AdminProductDetailSerializer, 
@@ -47,6 +61,221 @@ def make_admin_token(username: str, password: str) -> str:
     return base64.b64encode(raw).decode('utf-8')
 
 
+@functools.lru_cache(maxsize=4)
+def expected_admin_token(username: str, password: str) -> bytes:
+    """Token bytes for the configured admin credentials, encoded once per credential pair"""
+    return make_admin_token(username, password).encode('utf-8')
+
+
+# Columns AdminProductListSerializer reads (including the embedded seller and
+# category name); keep in sync when fields are added to that serializer
+ADMIN_PRODUCT_LIST_FIELDS = (
+    'id', 'uuid', 'title', 'crop', 'variety', 'grade', 'pexels_image_url',
+    'quantity_available', 'unit', 'price_per_unit',
+    'latitude', 'longitude', 'city', 'pincode', 'is_published',
+    'target_mandi_owners', 'target_shopkeepers', 'target_communities',
+    'created_at', 'updated_at',
+    'category', 'category__name',
+    'seller', 'seller__full_name', 'seller__mobile_number', 'seller__user_type',
+    'seller__city', 'seller__state', 'seller__pincode', 'seller__registration_method',
+    'seller__is_mobile_verified', 'seller__is_profile_complete', 'seller__is_active',
+    'seller__created_at', 'seller__updated_at',
+)
+
+
+# Sets an ETag from the rendered body and answers a matching If-None-Match
+# with 304, so unchanged repeat requests don't send the page again
+conditional_get = decorator_from_middleware(ConditionalGetMiddleware)
+
+
+# Admin product status (see Product.status) mapped to the condition selecting it
+PRODUCT_STATUS_FILTERS = {
+    'active': Q(is_published=True, quantity_available__gt=0),
+    'inactive': Q(is_published=False),
+    'sold_out': Q(is_published=True, quantity_available=0),
+}
+
+
+def filter_by_status(queryset, status_filter):
+    """Restrict products to an admin status; unknown or empty values leave it unfiltered"""
+    condition = PRODUCT_STATUS_FILTERS.get(status_filter)
+    return queryset if condition is None else queryset.filter(condition)
+
+
+def admin_product_list_queryset():
+    """Products with the related rows and columns needed by AdminProductListSerializer"""
+    return Product.objects.select_related('seller', 'category').prefetch_related(
+        admin_listing_image_prefetch()
+    ).only(*ADMIN_PRODUCT_LIST_FIELDS)
+
+
+# Products read from the database (and encoded) per chunk when streaming a listing
+STREAM_CHUNK_SIZE = 200
+
+
+def stream_product_listing(payload, products, trailer=None):
+    """StreamingHttpResponse for payload plus a "products" list serialized in chunks.
+
+    Peak memory stays at one chunk of products however many the listing has.
+    trailer(count), if given, returns keys to append after the list, for values
+    only known once every product has been read. Encoded like DRF's JSONRenderer.
+    """
+    def dumps(value):
+        return json.dumps(value, cls=JSONEncoder, ensure_ascii=False, separators=(',', ':'))
+
+    def generate():
+        row_serializer = AdminProductListSerializer()
+        # payload always has 'success', so dropping its closing brace leaves "{...,"
+        yield (dumps(payload)[:-1] + ',"products":[').encode('utf-8')
+        count = 0
+        rows = []
+        for product in products.iterator(chunk_size=STREAM_CHUNK_SIZE):
+            rows.append(dumps(row_serializer.to_representation(product)))
+            count += 1
+            if len(rows) == STREAM_CHUNK_SIZE:
+                yield ((',' if count > len(rows) else '') + ','.join(rows)).encode('utf-8')
+                rows = []
+        if rows:
+            yield ((',' if count > len(rows) else '') + ','.join(rows)).encode('utf-8')
+        tail = ']'
+        for key, value in (trailer(count) if trailer else {}).items():
+            tail += ',' + dumps(key) + ':' + dumps(value)
+        yield (tail + '}').encode('utf-8')
+
+    return StreamingHttpResponse(generate(), content_type='application/json')
+
+
+def admin_product_detail_queryset():
+    """Products with the related rows AdminProductDetailSerializer reads"""
+    return Product.objects.select_related('seller', 'category').prefetch_related(
+        admin_image_prefetch()
+    )
+
+
+def admin_image_prefetch():
+    """Prefetch for product images with just the fields the admin serializers read.
+
+    Ordered by id so the in-memory "first image" fallback matches images.first().
+    """
+    return Prefetch(
+        'images',
+        queryset=ProductImage.objects.only('id', 'product', 'url', 'image', 'is_primary', 'caption').order_by('id')
+    )
+
+
+def admin_listing_image_prefetch():
+    """Prefetch of just the image a listing row shows: the primary one, else the first by id.
+
+    The slice is applied per product (ROW_NUMBER() OVER (PARTITION BY product)),
+    so one image row is read per product however many it has. Lands in
+    product.listing_images, which AdminProductListSerializer checks first.
+    """
+    return Prefetch(
+        'images',
+        queryset=ProductImage.objects.only('id', 'product', 'url', 'image', 'is_primary', 'caption').order_by('-is_primary', 'id')[:1],
+        to_attr='listing_images'
+    )
+
+
+# AdminProductStatsView caches its payload under this key. Admin product writes
+# delete it from the shared cache, so every worker rebuilds it on the next
+# request; other product changes show up once the timeout expires.
+ADMIN_PRODUCT_STATS_CACHE_KEY = 'admin_product_stats'
+ADMIN_PRODUCT_STATS_CACHE_TIMEOUT = 120  # 2 minutes
+
+# Top category/city rankings shift slowly, so they are cached apart from the
+# counts for longer and are not cleared by admin writes: every worker reads the
+# same shared entry, which is at most ten minutes old
+ADMIN_PRODUCT_RANKINGS_CACHE_KEY = 'admin_product_rankings'
+ADMIN_PRODUCT_RANKINGS_CACHE_TIMEOUT = 600  # 10 minutes
+
+
+def admin_product_rankings():
+    """(top_categories, top_cities): the ten largest of each by product count, cached"""
+    rankings = cache.get(ADMIN_PRODUCT_RANKINGS_CACHE_KEY)
+    if rankings is None:
+        top_categories = list(Product.objects.values('category').annotate(
+            count=Count('id')
+        ).order_by('-count')[:10])
+        top_cities = list(Product.objects.exclude(city__isnull=True).exclude(city='').values('city').annotate(
+            count=Count('id')
+        ).order_by('-count')[:10])
+        rankings = (top_categories, top_cities)
+        cache.set(ADMIN_PRODUCT_RANKINGS_CACHE_KEY, rankings, ADMIN_PRODUCT_RANKINGS_CACHE_TIMEOUT)
+    return rankings
+
+
+# Orderings accepted by the admin product list, mapped to their order_by
+# expression. category__name is nullable: uncategorized products sort last in
+# both directions. The other columns are NOT NULL and keep the plain direction
+# so it matches their indexes.
+ADMIN_PRODUCT_ORDERINGS = {
+    'created_at': F('created_at').asc(),
+    '-created_at': F('created_at').desc(),
+    'updated_at': F('updated_at').asc(),
+    '-updated_at': F('updated_at').desc(),
+    'price_per_unit': F('price_per_unit').asc(),
+    '-price_per_unit': F('price_per_unit').desc(),
+    'quantity_available': F('quantity_available').asc(),
+    '-quantity_available': F('quantity_available').desc(),
+    'title': F('title').asc(),
+    '-title': F('title').desc(),
+    'category__name': F('category__name').asc(nulls_last=True),
+    '-category__name': F('category__name').desc(nulls_last=True),
+}
+
+# Orderings the admin product list can page through with a cursor, mapped to the
+# parser for the ordering column's value as stored in the cursor. All of these
+# columns are non-null, so (value, id) gives a strict total order.
+KEYSET_ORDERING_PARSERS = {
+    'created_at': datetime.fromisoformat,
+    'updated_at': datetime.fromisoformat,
+    'price_per_unit': Decimal,
+    'quantity_available': Decimal,
+    'title': str,
+}
+
+
+def encode_cursor(value, pk):
+    """Opaque cursor for the row after which the next page starts"""
+    value = value.isoformat() if isinstance(value, datetime) else str(value)
+    raw = json.dumps([value, pk]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+
+def decode_cursor(cursor, parse):
+    """Decode a cursor from encode_cursor; raises ValueError if it is malformed"""
+    try:
+        value, pk = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        return parse(value), int(pk)
+    except Exception as exc:
+        raise ValueError('Invalid cursor') from exc
+
+
+def query_param(params, name, default=''):
+    """Stripped query parameter value"""
+    return params.get(name, default).strip()
+
+
+def estimated_product_count():
+    """Planner's row estimate for the products table (Postgres only), or None.
+
+    Reading pg_class is constant time, unlike COUNT(*) which scans the table.
+    """
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+            [Product._meta.db_table]
+        )
+        row = cursor.fetchone()
+    # reltuples is -1 until the table has been vacuumed/analyzed
+    if row is None or row[0] < 0:
+        return None
+    return row[0]
+
+
 class AdminPermissionMixin:
     """Mixin to check X-Admin-Token header or basic auth style token"""
 
@@ -66,8 +295,11 @@ class AdminPermissionMixin:
         if not expected_user or not expected_pass:
             return False
         
-        expected = make_admin_token(expected_user, expected_pass)
-        return header_token == expected
+        # Constant-time comparison so response timing reveals nothing about the token
+        return hmac.compare_digest(
+            header_token.encode('utf-8'),
+            expected_admin_token(expected_user, expected_pass)
+        )
 
     def get_admin_username(self, request):
         """Extract admin username from auth header for logging purposes"""
@@ -85,6 +317,7 @@ class AdminPermissionMixin:
 @extend_schema(
     parameters=[
         OpenApiParameter(name='search', type=OpenApiTypes.STR, description='Search in title, category, crop, variety, seller name'),
+        OpenApiParameter(name='search_mode', type=OpenApiTypes.STR, description='Set to fulltext for word-based search ranked by relevance (default: substring match)'),
         OpenApiParameter(name='status', type=OpenApiTypes.STR, description='Filter by status: active, inactive, sold_out'),
         OpenApiParameter(name='category', type=OpenApiTypes.STR, description='Filter by product category'),
         OpenApiParameter(name='city', type=OpenApiTypes.STR, description='Filter by city'),
@@ -95,10 +328,13 @@ class AdminPermissionMixin:
         OpenApiParameter(name='date_to', type=OpenApiTypes.DATE, description='Filter products uploaded to this date (YYYY-MM-DD)'),
         OpenApiParameter(name='ordering', type=OpenApiTypes.STR, description='Order by: created_at, -created_at, price_per_unit, -price_per_unit, quantity_available, -quantity_available'),
         OpenApiParameter(name='page', type=OpenApiTypes.INT, description='Page number'),
-        OpenApiParameter(name='page_size', type=OpenApiTypes.INT, description='Number of items per page (max 100)')
+        OpenApiParameter(name='page_size', type=OpenApiTypes.INT, description='Number of items per page (max 100)'),
+        OpenApiParameter(name='cursor', type=OpenApiTypes.STR, description='nextCursor from the previous page; replaces page and skips the total count'),
+        OpenApiParameter(name='include_total', type=OpenApiTypes.STR, description='Set to true to count all matching products when filters are applied')
     ],
     responses={200: dict}
 )
+@method_decorator(conditional_get, name='get')
 class AdminProductListView(AdminPermissionMixin, APIView):
     """
     Admin endpoint to list all products with comprehensive filtering and search capabilities.
@@ -107,7 +343,7 @@ class AdminProductListView(AdminPermissionMixin, APIView):
     - Search across product title, category, crop, variety, and seller name
     - Filter by status, category, city, seller, price range, date range
     - Sorting by various fields
-    - Pagination
+    - Pagination, by page number or by cursor (keyset) for constant-cost deep pages
     """
     permission_classes = [AllowAny]
 
@@ -120,42 +356,62 @@ class AdminProductListView(AdminPermissionMixin, APIView):
         return super().dispatch(request, *args, **kwargs)
 
     def get(self, request):
-        queryset = Product.objects.select_related('seller').prefetch_related('images')
+        params = request.query_params
+        queryset = admin_product_list_queryset()
         
         # Search functionality
-        search = request.query_params.get('search', '').strip()
+        search = query_param(params, 'search')
+        search_mode = query_param(params, 'search_mode')
+        rank_results = False
         if search:
-            queryset = queryset.filter(
-                Q(title__icontains=search) |
-                Q(category__name__icontains=search) |
-                Q(crop__icontains=search) |
-                Q(variety__icontains=search) |
-                Q(seller__full_name__icontains=search) |
-                Q(seller__mobile_number__icontains=search) |
-                Q(description__icontains=search)
-            )
+            # Category and seller matches are id subqueries rather than joins so
+            # every branch of the OR is on the product table, where Postgres can
+            # combine the trigram and foreign key indexes instead of scanning.
+            # They stay in the one statement: a short search such as a digit can
+            # match a large share of sellers.
+            category_ids = Category.objects.filter(name__icontains=search).values('id')
+            seller_ids = CustomUser.objects.filter(
+                Q(full_name__icontains=search) | Q(mobile_number__icontains=search)
+            ).values('id')
+            if search_mode == 'fulltext':
+                # Word-based match against the GIN-indexed search document,
+                # ranked so the best matches come first
+                search_query = SearchQuery(search, config='simple', search_type='websearch')
+                queryset = queryset.annotate(
+                    search_document=PRODUCT_SEARCH_VECTOR,
+                    search_rank=SearchRank(PRODUCT_SEARCH_VECTOR, search_query)
+                ).filter(
+                    Q(search_document=search_query) |
+                    Q(category_id__in=category_ids) |
+                    Q(seller_id__in=seller_ids)
+                )
+                rank_results = True
+            else:
+                queryset = queryset.filter(
+                    Q(title__icontains=search) |
+                    Q(category_id__in=category_ids) |
+                    Q(crop__icontains=search) |
+                    Q(variety__icontains=search) |
+                    Q(seller_id__in=seller_ids) |
+                    Q(description__icontains=search)
+                )
 
         # Status filter
-        status_filter = request.query_params.get('status', '').strip()
-        if status_filter == 'active':
-            queryset = queryset.filter(is_published=True, quantity_available__gt=0)
-        elif status_filter == 'inactive':
-            queryset = queryset.filter(is_published=False)
-        elif status_filter == 'sold_out':
-            queryset = queryset.filter(is_published=True, quantity_available=0)
+        status_filter = query_param(params, 'status')
+        queryset = filter_by_status(queryset, status_filter)
 
         # Category filter
-        category = request.query_params.get('category', '').strip()
+        category = query_param(params, 'category')
         if category:
             queryset = queryset.filter(category__name__icontains=category)
 
         # City filter
-        city = request.query_params.get('city', '').strip()
+        city = query_param(params, 'city')
         if city:
             queryset = queryset.filter(city__icontains=city)
 
         # Seller filter
-        seller_id = request.query_params.get('seller_id', '').strip()
+        seller_id = query_param(params, 'seller_id')
         if seller_id:
             try:
                 queryset = queryset.filter(seller_id=int(seller_id))
@@ -163,8 +419,8 @@ class AdminProductListView(AdminPermissionMixin, APIView):
                 pass
 
         # Price range filter
-        min_price = request.query_params.get('min_price', '').strip()
-        max_price = request.query_params.get('max_price', '').strip()
+        min_price = query_param(params, 'min_price')
+        max_price = query_param(params, 'max_price')
         if min_price:
             try:
                 queryset = queryset.filter(price_per_unit__gte=float(min_price))
@@ -177,60 +433,116 @@ class AdminProductListView(AdminPermissionMixin, APIView):
                 pass
 
         # Date range filter
-        date_from = request.query_params.get('date_from', '').strip()
-        date_to = request.query_params.get('date_to', '').strip()
+        date_from = query_param(params, 'date_from')
+        date_to = query_param(params, 'date_to')
+        # Half-open ranges on created_at itself (not its date) so an index can be used
         if date_from:
             try:
-                from datetime import datetime
-                date_obj = datetime.strptime(date_from, '%Y-%m-%d').date()
-                queryset = queryset.filter(created_at__date__gte=date_obj)
+                queryset = queryset.filter(created_at__gte=day_start(date.fromisoformat(date_from)))
             except ValueError:
                 pass
         if date_to:
             try:
-                from datetime import datetime
-                date_obj = datetime.strptime(date_to, '%Y-%m-%d').date()
-                queryset = queryset.filter(created_at__date__lte=date_obj)
+                queryset = queryset.filter(created_at__lt=day_start(date.fromisoformat(date_to) + timedelta(days=1)))
             except ValueError:
                 pass
 
         # Ordering
-        ordering = request.query_params.get('ordering', '-created_at')
-        valid_orderings = [
-            'created_at', '-created_at', 'updated_at', '-updated_at',
-            'price_per_unit', '-price_per_unit', 'quantity_available', '-quantity_available',
-            'title', '-title', 'category__name', '-category__name'
-        ]
-        if ordering in valid_orderings:
-            queryset = queryset.order_by(ordering)
+        ordering = params.get('ordering', '-created_at')
+        order_field = ordering if ordering in ADMIN_PRODUCT_ORDERINGS else '-created_at'
+        descending = order_field.startswith('-')
+        keyset_field = order_field.lstrip('-')
+        order_expression = ADMIN_PRODUCT_ORDERINGS[order_field]
+        # id breaks ties so pages (and cursors) are stable between requests
+        if rank_results and 'ordering' not in params:
+            # Relevance first; rank is not a column, so there is no cursor for it
+            queryset = queryset.order_by('-search_rank', order_expression, '-id' if descending else 'id')
+            keyset_field = 'search_rank'
         else:
-            queryset = queryset.order_by('-created_at')
+            queryset = queryset.order_by(order_expression, '-id' if descending else 'id')
 
         # Pagination
-        page = int(request.query_params.get('page', 1))
-        page_size = min(int(request.query_params.get('page_size', 20)), 100)  # Max 100 items per page
+        page_size = min(int(params.get('page_size', 20)), 100)  # Max 100 items per page
+        cursor = query_param(params, 'cursor')
+        parse_cursor_value = KEYSET_ORDERING_PARSERS.get(keyset_field)
+        
+        if cursor:
+            # Keyset pagination: seek past the cursor row instead of OFFSET, so
+            # every page costs the same however deep it is
+            if parse_cursor_value is None:
+                return Response(
+                    {'success': False, 'message': f'Cursor pagination is not supported for ordering: {keyset_field}'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            try:
+                last_value, last_id = decode_cursor(cursor, parse_cursor_value)
+            except ValueError:
+                return Response(
+                    {'success': False, 'message': 'Invalid cursor'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            lookup = 'lt' if descending else 'gt'
+            queryset = queryset.filter(
+                Q(**{f'{keyset_field}__{lookup}': last_value}) |
+                Q(**{keyset_field: last_value, f'id__{lookup}': last_id})
+            )
+            
+            # One extra row tells whether another page follows
+            products = list(queryset[:page_size + 1])
+            has_next = len(products) > page_size
+            products = products[:page_size]
+            pagination = {
+                'pageSize': page_size,
+                'hasNext': has_next,
+                'hasPrev': True
+            }
+        else:
+            page = int(params.get('page', 1))
+            start = (page - 1) * page_size
+            
+            # One extra row tells whether another page follows, without a COUNT
+            products = list(queryset[start:start + page_size + 1])
+            has_next = len(products) > page_size
+            products = products[:page_size]
+            
+            # A filtered COUNT scans every matching row, so it is only run on
+            # request. Unfiltered lists use the planner's estimate when there is one.
+            include_total = query_param(params, 'include_total').lower() in ('1', 'true', 'yes', 'on')
+            filtered = any((search, status_filter, category, city, seller_id,
+                            min_price, max_price, date_from, date_to))
+            total_count = None
+            total_estimated = False
+            if not filtered and not include_total:
+                total_count = estimated_product_count()
+                total_estimated = total_count is not None
+            if total_count is None and (include_total or not filtered):
+                total_count = queryset.count()
+            
+            pagination = {
+                'currentPage': page,
+                'pageSize': page_size,
+                'totalCount': total_count,
+                'totalCountEstimated': total_estimated,
+                'totalPages': (total_count + page_size - 1) // page_size if total_count is not None else None,
+                'hasNext': has_next,
+                'hasPrev': page > 1
+            }
         
-        total_count = queryset.count()
-        start = (page - 1) * page_size
-        end = start + page_size
+        pagination['nextCursor'] = None
+        if has_next and products and parse_cursor_value is not None:
+            last = products[-1]
+            pagination['nextCursor'] = encode_cursor(getattr(last, keyset_field), last.pk)
         
-        products = queryset[start:end]
         serializer = AdminProductListSerializer(products, many=True)
         
-        return Response({
+        response = Response({
             'success': True,
             'data': {
                 'products': serializer.data,
-                'pagination': {
-                    'currentPage': page,
-                    'pageSize': page_size,
-                    'totalCount': total_count,
-                    'totalPages': (total_count + page_size - 1) // page_size,
-                    'hasNext': end < total_count,
-                    'hasPrev': page > 1
-                },
+                'pagination': pagination,
                 'filters': {
                     'search': search,
+                    'search_mode': search_mode,
                     'status': status_filter,
                     'category': category,
                     'city': city,
@@ -243,6 +555,9 @@ class AdminProductListView(AdminPermissionMixin, APIView):
                 }
             }
         })
+        # Let the browser keep the page but revalidate it every time (see conditional_get)
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
 
 
 @extend_schema(responses={200: dict})
@@ -263,12 +578,12 @@ class AdminProductDetailView(AdminPermissionMixin, APIView):
 
     def get(self, request, product_uuid):
         try:
-            product = Product.objects.select_related('seller').prefetch_related('images').get(uuid=product_uuid)
+            product = admin_product_detail_queryset().get(uuid=product_uuid)
             serializer = AdminProductDetailSerializer(product)
             
             # Log admin action
             admin_username = self.get_admin_username(request)
-            AdminActionLog.objects.create(
+            log_admin_action(
                 admin_username=admin_username,
                 user=product.seller,
                 action='view',
@@ -302,52 +617,49 @@ class AdminProductStatsView(AdminPermissionMixin, APIView):
         return super().dispatch(request, *args, **kwargs)
 
     def get(self, request):
-        # Basic counts
-        total_products = Product.objects.count()
-        active_products = Product.objects.filter(is_published=True, quantity_available__gt=0).count()
-        inactive_products = Product.objects.filter(is_published=False).count()
-        sold_out_products = Product.objects.filter(is_published=True, quantity_available=0).count()
-        
-        # Value calculations
-        total_value = Product.objects.filter(is_published=True).aggregate(
-            total=Sum('price_per_unit')
-        )['total'] or 0
-        
-        average_price = Product.objects.filter(is_published=True).aggregate(
-            avg=Avg('price_per_unit')
-        )['avg'] or 0
-        
-        # Top categories
-        top_categories = list(Product.objects.values('category').annotate(
-            count=Count('id')
-        ).order_by('-count')[:10])
-        
-        # Top cities
-        top_cities = list(Product.objects.exclude(city__isnull=True).exclude(city='').values('city').annotate(
-            count=Count('id')
-        ).order_by('-count')[:10])
+        cached_stats = cache.get(ADMIN_PRODUCT_STATS_CACHE_KEY)
+        if cached_stats is not None:
+            return Response({
+                'success': True,
+                'stats': cached_stats
+            })
         
-        # Recent uploads (last 7 days)
+        # Counts, value calculations and recent uploads (last 7 days) in one
+        # pass over the table using filtered aggregates
         week_ago = timezone.now() - timedelta(days=7)
-        recent_uploads = Product.objects.filter(created_at__gte=week_ago).count()
+        totals = Product.objects.aggregate(
+            total_products=Count('id'),
+            active_products=Count('id', filter=PRODUCT_STATUS_FILTERS['active']),
+            inactive_products=Count('id', filter=PRODUCT_STATUS_FILTERS['inactive']),
+            sold_out_products=Count('id', filter=PRODUCT_STATUS_FILTERS['sold_out']),
+            total_value=Sum('price_per_unit', filter=Q(is_published=True)),
+            average_price=Avg('price_per_unit', filter=Q(is_published=True)),
+            recent_uploads=Count('id', filter=Q(created_at__gte=week_ago)),
+        )
+        
+        # Top categories and cities (cached on their own, see admin_product_rankings)
+        top_categories, top_cities = admin_product_rankings()
         
         stats_data = {
-            'totalProducts': total_products,
-            'activeProducts': active_products,
-            'inactiveProducts': inactive_products,
-            'soldOutProducts': sold_out_products,
-            'totalValue': total_value,
-            'averagePrice': average_price,
+            'totalProducts': totals['total_products'],
+            'activeProducts': totals['active_products'],
+            'inactiveProducts': totals['inactive_products'],
+            'soldOutProducts': totals['sold_out_products'],
+            'totalValue': totals['total_value'] or 0,
+            'averagePrice': totals['average_price'] or 0,
             'topCategories': top_categories,
             'topCities': top_cities,
-            'recentUploads': recent_uploads
+            'recentUploads': totals['recent_uploads']
         }
         
         serializer = AdminProductStatsSerializer(stats_data)
+        # Plain dict: ReturnDict keeps a reference to the serializer
+        stats = dict(serializer.data)
+        cache.set(ADMIN_PRODUCT_STATS_CACHE_KEY, stats, ADMIN_PRODUCT_STATS_CACHE_TIMEOUT)
         
         return Response({
             'success': True,
-            'stats': serializer.data
+            'stats': stats
         })
 
 
@@ -368,18 +680,32 @@ class AdminProductUpdateView(AdminPermissionMixin, APIView):
 
     def patch(self, request, product_uuid):
         try:
-            product = Product.objects.get(uuid=product_uuid)
+            # The response is the full detail payload, so load what it reads up front
+            product = admin_product_detail_queryset().get(uuid=product_uuid)
             serializer = AdminProductUpdateSerializer(product, data=request.data, partial=True)
             
             if serializer.is_valid():
+                changed = any(
+                    getattr(product, field) != value
+                    for field, value in serializer.validated_data.items()
+                )
+                if not changed:
+                    # Idempotent patch: nothing to write, invalidate or log
+                    return Response({
+                        'success': True,
+                        'message': 'Product updated successfully',
+                        'product': AdminProductDetailSerializer(product).data
+                    })
+                
                 old_status = product.is_published
                 serializer.save()
+                cache.delete(ADMIN_PRODUCT_STATS_CACHE_KEY)
                 
                 # Log admin action
                 admin_username = self.get_admin_username(request)
                 action_details = f'Updated product status from {"published" if old_status else "unpublished"} to {"published" if product.is_published else "unpublished"}'
                 
-                AdminActionLog.objects.create(
+                log_admin_action(
                     admin_username=admin_username,
                     user=product.seller,
                     action='other',
@@ -422,7 +748,8 @@ class AdminProductDeleteView(AdminPermissionMixin, APIView):
 
     def delete(self, request, product_uuid):
         try:
-            product = Product.objects.get(uuid=product_uuid)
+            # Only the title and seller are read before deleting
+            product = Product.objects.only('id', 'uuid', 'title', 'seller').get(uuid=product_uuid)
             product_title = product.title
             seller = product.seller
 
@@ -444,10 +771,11 @@ class AdminProductDeleteView(AdminPermissionMixin, APIView):
                 product.delete()
                 result_message = 'Product permanently deleted'
                 details_msg = f'Hard deleted product: {product_title} (ID: {product_uuid})'
+            cache.delete(ADMIN_PRODUCT_STATS_CACHE_KEY)
 
             # Log admin action
             admin_username = self.get_admin_username(request)
-            AdminActionLog.objects.create(
+            log_admin_action(
                 admin_username=admin_username,
                 user=seller,
                 action='delete',
@@ -489,39 +817,36 @@ class AdminSellerProductsView(AdminPermissionMixin, APIView):
     def get(self, request, seller_id):
         try:
             seller = CustomUser.objects.get(id=seller_id)
-            products = Product.objects.filter(seller=seller).order_by('-created_at')
+            products = admin_product_list_queryset().filter(seller=seller).order_by('-created_at')
             
             # Apply basic filters if provided
-            status_filter = request.query_params.get('status', '').strip()
-            if status_filter == 'active':
-                products = products.filter(is_published=True, quantity_available__gt=0)
-            elif status_filter == 'inactive':
-                products = products.filter(is_published=False)
-            elif status_filter == 'sold_out':
-                products = products.filter(is_published=True, quantity_available=0)
+            products = filter_by_status(products, query_param(request.query_params, 'status'))
             
-            serializer = AdminProductListSerializer(products, many=True)
             
             # Log admin action
             admin_username = self.get_admin_username(request)
-            AdminActionLog.objects.create(
+            log_admin_action(
                 admin_username=admin_username,
                 user=seller,
                 action='view',
                 details=f'Viewed all products for seller: {seller.full_name} ({seller.get_identifier()})'
             )
             
-            return Response({
-                'success': True,
-                'seller': {
-                    'id': seller.id,
-                    'fullName': seller.full_name,
-                    'mobileNumber': seller.mobile_number,
-                    'city': seller.city,
-                    'totalProducts': products.count()
-                },
-                'products': serializer.data
-            })
+            # Streamed; the seller block follows the products so its total is
+            # the number streamed rather than a separate COUNT query
+            return stream_product_listing(
+                {'success': True},
+                products,
+                trailer=lambda count: {
+                    'seller': {
+                        'id': seller.id,
+                        'fullName': seller.full_name,
+                        'mobileNumber': seller.mobile_number,
+                        'city': seller.city,
+                        'totalProducts': count
+                    }
+                }
+            )
             
         except CustomUser.DoesNotExist:
             return Response(
@@ -551,30 +876,29 @@ class AdminCategoryProductsView(AdminPermissionMixin, APIView):
         return super().dispatch(request, *args, **kwargs)
 
     def get(self, request, category):
-        products = Product.objects.filter(category__iexact=category).select_related('seller').order_by('-created_at')
+        products = admin_product_list_queryset().filter(category__name__iexact=category).order_by('-created_at')
         
-        if not products.exists():
+        # Category analytics in a single aggregate; an empty category counts zero
+        analytics = products.aggregate(
+            total_products=Count('id'),
+            active_products=Count('id', filter=PRODUCT_STATUS_FILTERS['active']),
+            total_sellers=Count('seller', distinct=True),
+            avg_price=Avg('price_per_unit'),
+        )
+        
+        if not analytics['total_products']:
             return Response(
                 {'success': False, 'message': f'No products found in category: {category}'}, 
                 status=status.HTTP_404_NOT_FOUND
             )
         
-        # Category analytics
-        total_products = products.count()
-        active_products = products.filter(is_published=True, quantity_available__gt=0).count()
-        total_sellers = products.values('seller').distinct().count()
-        avg_price = products.aggregate(avg=Avg('price_per_unit'))['avg'] or 0
-        
-        serializer = AdminProductListSerializer(products, many=True)
-        
-        return Response({
+        return stream_product_listing({
             'success': True,
             'category': category,
             'analytics': {
-                'totalProducts': total_products,
-                'activeProducts': active_products,
-                'totalSellers': total_sellers,
-                'averagePrice': avg_price
-            },
-            'products': serializer.data
-        })
\ No newline at end of file
+                'totalProducts': analytics['total_products'],
+                'activeProducts': analytics['active_products'],
+                'totalSellers': analytics['total_sellers'],
+                'averagePrice': analytics['avg_price'] or 0
+            }
+        }, products)
\ No newline at end of file
@@ -1,14 +1,25 @@
 from rest_framework import serializers
-from ..models import Category, Product, ProductImage
+from ..models import Category, Product, ProductImage, UNIT_CHOICES
+from ..signals import defer_primary_image_refresh
 from django.core.validators import URLValidator
 from django.utils import timezone
-import math
-from django.core.files.base import ContentFile
-import requests
-from urllib.parse import urlparse
-import os
-from django.core.files.uploadedfile import InMemoryUploadedFile, TemporaryUploadedFile
-from decimal import Decimal
+from django.db import models, transaction
+from django.db.models import Prefetch
+from decimal import Decimal, InvalidOperation
+import copy
+from concurrent.futures import ThreadPoolExecutor
+
+# Unit spellings mapped straight to the canonical Product unit
+_UNIT_EXACT = {
+    'kg': 'KG', 'kilogram': 'KG', 'kilograms': 'KG',
+    'quintal': 'QUINTAL', 'ton': 'TON', 'tonne': 'TON', 'dozen': 'DOZEN',
+    'unit': 'UNIT', 'piece': 'UNIT', 'pieces': 'UNIT',
+}
+# Fuzzy matches for other spellings, checked in this order
+_UNIT_SUBSTR = (('quint', 'QUINTAL'), ('ton', 'TON'), ('dozen', 'DOZEN'))
+# Canonical unit as shown to clients
+_UNIT_DISPLAY = {unit: unit.lower() for unit, _ in UNIT_CHOICES}
+
 
 # helper to normalize unit strings to canonical values used in the Product model
 def _normalize_unit(unit_val):
@@ -17,59 +28,129 @@ def _normalize_unit(unit_val):
     s = str(unit_val).strip().lower()
     if not s:
         return unit_val
-    # common mappings and fuzzy matches
-    if 'quint' in s:
-        return 'QUINTAL'
-    if s in ('kg', 'kilogram', 'kilograms') or 'kg' == s:
-        return 'KG'
-    if 'ton' in s or 'tonne' in s:
-        return 'TON'
-    if 'dozen' in s:
-        return 'DOZEN'
-    if s in ('unit', 'piece', 'pieces'):
-        return 'UNIT'
-    # If the value already looks like an uppercase canonical value, return uppercase
-    up = str(unit_val).strip().upper()
-    return up
+    unit = _UNIT_EXACT.get(s)
+    if unit is not None:
+        return unit
+    # common fuzzy matches; otherwise treat the value as an already canonical unit
+    return next((unit for part, unit in _UNIT_SUBSTR if part in s), None) or str(unit_val).strip().upper()
 
 # Allowed buyer categories for visibility (match users.models CustomUser.BUYER_CATEGORY_CHOICES)
-ALLOWED_BUYER_CATEGORIES = {'mandi_owner', 'shopkeeper', 'community'}
+ALLOWED_BUYER_CATEGORIES = frozenset(('mandi_owner', 'shopkeeper', 'community'))
+# Listed in validation errors, and the fixed order views iterate the categories in
+SORTED_BUYER_CATEGORIES = sorted(ALLOWED_BUYER_CATEGORIES)
+
+
+# camelCase aliases accepted from clients and the model fields they map to
+# (quantityUnit is mapped separately, as it is normalized on the way)
+_FIELD_ALIASES = (
+    ('availableQuantity', 'quantity_available'),
+    ('pricePerUnit', 'price_per_unit'),
+    ('priceCurrency', 'price_currency'),
+    ('priceType', 'price_type'),
+    ('marketPriceSource', 'market_price_source'),
+    ('minOrderQuantity', 'min_order_quantity'),
+)
+# Minimum order quantity when the seller doesn't give one, in the seller's unit
+_DEFAULT_MIN_ORDER_QUANTITY = Decimal('1')
+
+
+def _map_field_aliases(data):
+    """Move camelCase alias values onto their model field names, updating data in place"""
+    for alias, field in _FIELD_ALIASES:
+        if alias in data:
+            data[field] = data.pop(alias)
+    if 'quantityUnit' in data:
+        data['unit'] = _normalize_unit(data.pop('quantityUnit'))
+
+
+_HUNDRED = Decimal('100')  # kilograms per quintal
+_PRICE_Q = Decimal('0.01')
+
+
+def _convert_quintal_to_kg(data):
+    """Re-express quintal quantities and price in kilograms, updating data in place"""
+    for field in ('quantity_available', 'min_order_quantity'):
+        value = _as_decimal(data.get(field))
+        if value is not None:
+            data[field] = value * _HUNDRED
+    # price per quintal -> price per kg, kept to two decimal places
+    price = _as_decimal(data.get('price_per_unit'))
+    if price is not None:
+        data['price_per_unit'] = (price / _HUNDRED).quantize(_PRICE_Q)
+    # store normalized unit as kilograms
+    data['unit'] = 'KG'
+
+
+def _as_decimal(value):
+    """value as a finite Decimal, or None if it is not a number.
+
+    DecimalFields already hand validate() a Decimal, which is returned as is.
+    """
+    if not isinstance(value, Decimal):
+        try:
+            value = Decimal(str(value))
+        except (InvalidOperation, ValueError, TypeError):
+            return None
+    return value if value.is_finite() else None
+
+
+# Upper bound on concurrent storage writes for one request's uploaded images
+IMAGE_UPLOAD_WORKERS = 8
+
+
+def _store_uploaded_image(product_image):
+    """Write an unsaved ProductImage's upload to storage and resize it, as its save() would"""
+    upload = product_image.image
+    upload.save(upload.name, upload.file, save=False)
+    product_image.resize_image(upload.path)
 
 
-def download_remote_image(url, timeout=10):
-    """Download a remote image and return a Django ContentFile suitable for ImageField.
+def save_product_images(product, images):
+    """Create the ProductImage rows for a product from URL dicts and uploaded files.
 
-    Returns None on failure.
+    Uploads are written to storage concurrently (no database access happens in
+    the workers), then every row is inserted with one bulk_create. That skips
+    ProductImage.save() and its signals, so primary_image_url is refreshed once here.
     """
-    if not url:
-        return None
-    # Quick validation
-    try:
-        parsed = urlparse(url)
-        if parsed.scheme not in ('http', 'https'):
-            return None
-    except Exception:
-        return None
+    product_images = []
+    uploads = []
+    for img in images:
+        if isinstance(img, dict) and img.get('url'):
+            product_images.append(ProductImage(product=product, url=img['url'], is_primary=img.get('isPrimary', False)))
+        else:
+            # assume it's already a file-like object acceptable to ImageField
+            upload = ProductImage(product=product, image=img)
+            uploads.append(upload)
+            product_images.append(upload)
+    if not product_images:
+        return
 
-    try:
-        resp = requests.get(url, timeout=timeout)
-        if resp.status_code != 200:
-            return None
-        content_type = resp.headers.get('Content-Type', '')
-        if not content_type.startswith('image'):
-            return None
+    if len(uploads) > 1:
+        with ThreadPoolExecutor(max_workers=min(IMAGE_UPLOAD_WORKERS, len(uploads))) as executor:
+            list(executor.map(_store_uploaded_image, uploads))
+    elif uploads:
+        _store_uploaded_image(uploads[0])
 
-        # derive a filename
-        filename = os.path.basename(parsed.path) or 'image'
-        # ensure we have an extension
-        if not os.path.splitext(filename)[1]:
-            # try to infer extension from content-type
-            ext = content_type.split('/')[-1].split(';')[0]
-            filename = f"{filename}.{ext}"
+    ProductImage.objects.bulk_create(product_images)
+    Product.refresh_primary_image_url(product.pk)
 
-        return ContentFile(resp.content, name=filename)
-    except Exception:
-        return None
+
+# Field sets built by CachedFieldsMixin, keyed by serializer class
+_FIELDS_CACHE = {}
+
+
+class CachedFieldsMixin:
+    """Build a ModelSerializer's fields once per class instead of per instance.
+
+    get_fields() deep-copies every declared field and introspects the model each
+    time a serializer is created, though the result depends only on the class.
+    The first build is kept unbound; each instance binds shallow copies of it.
+    """
+    def get_fields(self):
+        template = _FIELDS_CACHE.get(type(self))
+        if template is None:
+            template = _FIELDS_CACHE[type(self)] = super().get_fields()
+        return {name: copy.copy(field) for name, field in template.items()}
 
 
 class CategorySerializer(serializers.ModelSerializer):
@@ -105,6 +186,10 @@ class CategoryListSerializer(serializers.ModelSerializer):
 
     def get_product_count(self, obj):
         """Count of active products in this category"""
+        # Annotated by list_categories for the whole listing in one query
+        published_count = getattr(obj, 'published_product_count', None)
+        if published_count is not None:
+            return published_count
         return obj.products.filter(is_published=True).count()
 
 
@@ -118,6 +203,9 @@ class ProductImageSerializer(serializers.ModelSerializer):
     def get_url(self, obj):
         if obj.url:
             return obj.url
+        # An empty ImageField raises on .url; skip the exception when there is no file
+        if not obj.image:
+            return None
         try:
             return obj.image.url
         except Exception:
@@ -137,9 +225,9 @@ class ImageOrUrlField(serializers.Field):
                 return data
             raise serializers.ValidationError('dict image must contain "url"')
 
-        # Uploaded files from multipart/form-data will generally be
-        # InMemoryUploadedFile or TemporaryUploadedFile instances.
-        if isinstance(data, (InMemoryUploadedFile, TemporaryUploadedFile)) or hasattr(data, 'read'):
+        # Uploaded files from multipart/form-data (InMemoryUploadedFile,
+        # TemporaryUploadedFile) and any other file-like object
+        if hasattr(data, 'read'):
             return data
 
         raise serializers.ValidationError('Expected an uploaded file or a dict with "url"')
@@ -152,7 +240,108 @@ class ImageOrUrlField(serializers.Field):
             return None
 
 
-class ProductListSerializer(serializers.ModelSerializer):
+class ProductLocationSerializer(serializers.Serializer):
+    """Where a product is, as sent by clients in the "location" object.
+
+    Every key is required when creating a product (Product.pincode is NOT NULL);
+    partial updates change only the keys sent.
+    """
+    latitude = serializers.FloatField(min_value=-90, max_value=90)
+    longitude = serializers.FloatField(min_value=-180, max_value=180)
+    city = serializers.CharField(max_length=100, allow_blank=True, allow_null=True)
+    pincode = serializers.CharField(max_length=20, allow_blank=True)
+
+
+# Columns ProductListSerializer (and the views filtering on the loaded products)
+# read, including the seller's name; the category is loaded whole. Keep in sync
+# when fields are added to that serializer.
+PRODUCT_LIST_FIELDS = (
+    'id', 'uuid', 'title', 'description', 'category', 'crop', 'variety', 'grade',
+    'pexels_image_url', 'quantity_available', 'unit', 'price_per_unit', 'min_order_quantity',
+    'price_currency', 'price_type', 'market_price_source', 'mandi_price_reference',
+    'buyer_category_visibility', 'is_published', 'latitude', 'longitude', 'city', 'pincode',
+    'created_at', 'updated_at',
+    'seller', 'seller__full_name',
+)
+
+
+def product_images_prefetch(lookup='images'):
+    """Prefetch for the images ProductListSerializer nests, in upload (id) order.
+
+    lookup is the path to the images from the queryset being prefetched for,
+    e.g. 'items__product__images' from a cart.
+    """
+    return Prefetch(lookup, queryset=ProductImage.objects.order_by('id'))
+
+
+def _text(value):
+    """CharField output: str(value), keeping None as None"""
+    return None if value is None else str(value)
+
+
+class ProductListFastSerializer(serializers.ListSerializer):
+    """ProductListSerializer(many=True), with each product mapped to a dict by hand.
+
+    Listing endpoints serialize whole pages of products, and dispatching through
+    every declared field (and the nested images serializer) per product dominated
+    their response time. Single products still go through ProductListSerializer's
+    fields. Keep in step with ProductListSerializer.Meta.fields.
+    """
+    def to_representation(self, data):
+        iterable = data.all() if isinstance(data, models.manager.BaseManager) else data
+        child = self.child
+        fields = child.fields
+        image_serializer = fields['images'].child
+        available_quantity = fields['availableQuantity']
+        price_per_unit = fields['pricePerUnit']
+        min_order_quantity = fields['minOrderQuantity']
+        created_at = fields['createdAt']
+        updated_at = fields['updatedAt']
+        rows = []
+        for product in iterable:
+            row = {
+                'id': _text(product.uuid),
+                'farmerId': _text(product.seller.id),
+                'title': _text(product.title),
+                'description': _text(product.description),
+                'category': child.get_category(product),
+                'crop': _text(product.crop),
+                'variety': _text(product.variety),
+                'grade': _text(product.grade),
+                'availableQuantity': available_quantity.to_representation(product.quantity_available) if product.quantity_available is not None else None,
+                'quantityUnit': child.get_quantityUnit(product),
+                'pricePerUnit': price_per_unit.to_representation(product.price_per_unit) if product.price_per_unit is not None else None,
+                'minOrderQuantity': min_order_quantity.to_representation(product.min_order_quantity) if product.min_order_quantity is not None else None,
+                'priceCurrency': _text(product.price_currency),
+                'priceType': _text(product.price_type),
+                'marketPriceSource': _text(product.market_price_source),
+                'mandiPriceReference': product.mandi_price_reference,
+                'location': child.get_location(product),
+                'buyerCategoryVisibility': product.buyer_category_visibility,
+                'images': [
+                    {
+                        'id': image.id,
+                        'url': image_serializer.get_url(image),
+                        'caption': _text(image.caption),
+                        'is_primary': bool(image.is_primary),
+                    }
+                    for image in product.images.all()
+                ],
+                'pexelsImageUrl': _text(product.pexels_image_url),
+                'status': _text(product.status),
+                'createdAt': created_at.to_representation(product.created_at) if product.created_at else None,
+                'updatedAt': updated_at.to_representation(product.updated_at) if product.updated_at else None,
+            }
+            # Only present when the view attached a distance, as with the declared field
+            if hasattr(product, 'distanceMeters'):
+                distance = product.distanceMeters
+                row['distanceMeters'] = None if distance is None else int(distance)
+            row['seller'] = child.get_seller(product)
+            rows.append(row)
+        return rows
+
+
+class ProductListSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     id = serializers.CharField(source='uuid', read_only=True)
     farmerId = serializers.CharField(source='seller.id', read_only=True)
     # Keep names matching the read-model expected by clients; avoid redundant `source` where name==field
@@ -191,52 +380,54 @@ class ProductListSerializer(serializers.ModelSerializer):
             'marketPriceSource', 'mandiPriceReference', 'location', 'buyerCategoryVisibility',
             'images', 'pexelsImageUrl', 'status', 'createdAt', 'updatedAt', 'distanceMeters', 'seller'
         ]
+        list_serializer_class = ProductListFastSerializer
 
     def get_location(self, obj):
-        if obj.latitude is None or obj.longitude is None or obj.latitude == 0.0 or obj.longitude == 0.0:
+        lat = obj.latitude
+        lon = obj.longitude
+        # Missing and zero coordinates both mean "no location"
+        if not lat or not lon:
             return None
+        # Floats are what the JSON renderer would turn the Decimals into anyway
         return {
-            'latitude': obj.latitude,
-            'longitude': obj.longitude,
+            'latitude': float(lat),
+            'longitude': float(lon),
             'city': obj.city,
             'pincode': obj.pincode
         }
 
     def get_category(self, obj):
         # Return the category object if it exists
-        if obj.category:
-            return CategorySerializer(obj.category).data
-        return None
+        if obj.category_id is None:
+            return None
+        # Products in a list share a handful of categories; serialize each one
+        # once per response instead of once per product
+        category_map = self.context.setdefault('category_map', {})
+        category = category_map.get(obj.category_id)
+        if category is None:
+            category = category_map[obj.category_id] = CategorySerializer(obj.category).data
+        return category
 
     def get_seller(self, obj):
-        try:
-            s = obj.seller
-            # prefer uuid if user model has it, else use pk
-            seller_id = getattr(s, 'uuid', None) or getattr(s, 'id', None)
-            return {
-                'id': seller_id,
-                'full_name': getattr(s, 'full_name', None),
-                'mobile_number': 'XXXXXXXXXX',
-            }
-        except Exception:
-            return None
+        # Sellers are identified by pk (the user model has no uuid field)
+        s = obj.seller
+        return {
+            'id': s.id,
+            'full_name': s.full_name,
+            'mobile_number': 'XXXXXXXXXX',
+        }
 
     def get_quantityUnit(self, obj):
-        try:
-            u = getattr(obj, 'unit', None)
-            if not u:
-                return None
-            # return lowercase kg for KG and otherwise lowercase of canonical
-            if str(u).upper() == 'KG':
-                return 'kg'
-            return str(u).lower()
-        except Exception:
-            return getattr(obj, 'unit', None)
+        # lowercase of the canonical unit (kg for KG, and so on)
+        u = obj.unit
+        if not u:
+            return None
+        return _UNIT_DISPLAY.get(u) or str(u).lower()
 
 
-class ProductCreateSerializer(serializers.ModelSerializer):
+class ProductCreateSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     # location is required for product creation
-    location = serializers.DictField(write_only=True, required=True)
+    location = ProductLocationSerializer(write_only=True, required=True)
     # Category can be provided as category name (string) or category ID
     category = serializers.CharField(write_only=True, required=False, allow_null=True, allow_blank=True)
     # Validate buyer categories against the allowed set in validate()
@@ -272,11 +463,7 @@ class ProductCreateSerializer(serializers.ModelSerializer):
         }
 
     def validate(self, data):
-        # Validate required fields per frontend doc
-        location = data.get('location')
-        if 'latitude' not in location or 'longitude' not in location or 'city' not in location:
-            raise serializers.ValidationError({'location': 'location.city, location.latitude and location.longitude are required'})
-
+        # location (city, latitude and longitude, in range) is checked by ProductLocationSerializer
         price_type = data.get('price_type') or data.get('priceType') or 'fixed'
         market_source = data.get('market_price_source') or data.get('marketPriceSource')
         if price_type == 'market_linked' and not market_source:
@@ -287,46 +474,37 @@ class ProductCreateSerializer(serializers.ModelSerializer):
         aq = data.get('available_quantity') or data.get('availableQuantity')
         if aq is None:
             raise serializers.ValidationError({'availableQuantity': 'This field is required'})
-        try:
-            if float(aq) < 0:
-                raise serializers.ValidationError({'availableQuantity': 'must be >= 0'})
-        except (TypeError, ValueError):
+        aq = _as_decimal(aq)
+        if aq is None:
             raise serializers.ValidationError({'availableQuantity': 'invalid number'})
+        if aq < 0:
+            raise serializers.ValidationError({'availableQuantity': 'must be >= 0'})
 
         pp = data.get('price_per_unit') or data.get('pricePerUnit')
         if pp is None:
             raise serializers.ValidationError({'pricePerUnit': 'This field is required'})
-        try:
-            if float(pp) < 0:
-                raise serializers.ValidationError({'pricePerUnit': 'must be >= 0'})
-        except (TypeError, ValueError):
+        pp = _as_decimal(pp)
+        if pp is None:
             raise serializers.ValidationError({'pricePerUnit': 'invalid number'})
-
-        # latitude/longitude ranges if provided
-        if location is not None and location:
-            lat = location.get('latitude')
-            lon = location.get('longitude')
-            if lat is not None and lon is not None:
-                if not (-90 <= float(lat) <= 90) or not (-180 <= float(lon) <= 180):
-                    raise serializers.ValidationError({'location': 'latitude must be -90..90 and longitude -180..180'})
+        if pp < 0:
+            raise serializers.ValidationError({'pricePerUnit': 'must be >= 0'})
 
         # Validate buyerCategoryVisibility values if present
         bcv = data.get('buyerCategoryVisibility')
         if bcv is not None:
             if not isinstance(bcv, (list, tuple)):
                 raise serializers.ValidationError({'buyerCategoryVisibility': 'must be a list of allowed categories'})
-            invalid = [v for v in bcv if v not in ALLOWED_BUYER_CATEGORIES]
-            if invalid:
-                raise serializers.ValidationError({'buyerCategoryVisibility': f'invalid categories: {invalid}. allowed: {sorted(ALLOWED_BUYER_CATEGORIES)}'})
+            if not ALLOWED_BUYER_CATEGORIES.issuperset(bcv):
+                invalid = [v for v in bcv if v not in ALLOWED_BUYER_CATEGORIES]
+                raise serializers.ValidationError({'buyerCategoryVisibility': f'invalid categories: {invalid}. allowed: {SORTED_BUYER_CATEGORIES}'})
 
         # Validate category - convert category name to Category instance
         category_name = data.get('category')
         if category_name:
-            try:
-                category = Category.objects.get(name__iexact=category_name.strip(), is_active=True)
-                data['category'] = category
-            except Category.DoesNotExist:
+            category = Category.active_by_name().get(category_name.strip().lower())
+            if category is None:
                 raise serializers.ValidationError({'category': f'Category "{category_name}" not found. Please ensure the category exists and is active.'})
+            data['category'] = category
         else:
             data['category'] = None
 
@@ -339,23 +517,8 @@ class ProductCreateSerializer(serializers.ModelSerializer):
         user_image_url = validated_data.pop('pexelsImageUrl', None)
 
         # Normalize fields and map aliases
-        # Map camelCase to snake_case where user may have passed camelCase
         # Map camelCase aliases to actual model DB fields
-        if 'availableQuantity' in validated_data:
-            validated_data['quantity_available'] = validated_data.pop('availableQuantity')
-        if 'quantityUnit' in validated_data:
-            validated_data['unit'] = _normalize_unit(validated_data.pop('quantityUnit'))
-        if 'pricePerUnit' in validated_data:
-            validated_data['price_per_unit'] = validated_data.pop('pricePerUnit')
-        if 'priceCurrency' in validated_data:
-            validated_data['price_currency'] = validated_data.pop('priceCurrency')
-        if 'priceType' in validated_data:
-            validated_data['price_type'] = validated_data.pop('priceType')
-        if 'marketPriceSource' in validated_data:
-            validated_data['market_price_source'] = validated_data.pop('marketPriceSource')
-        # accept minOrderQuantity (camelCase) from some clients and map to DB field
-        if 'minOrderQuantity' in validated_data:
-            validated_data['min_order_quantity'] = validated_data.pop('minOrderQuantity')
+        _map_field_aliases(validated_data)
 
         # Allow caller to pass seller via serializer.save(seller=user)
         # Prefer explicit seller kwarg passed to serializer.save(seller=...)
@@ -383,72 +546,37 @@ class ProductCreateSerializer(serializers.ModelSerializer):
 
         # Ensure min_order_quantity defaults to 1 in the seller provided unit if not supplied
         if 'min_order_quantity' not in validated_data or validated_data.get('min_order_quantity') is None:
-            validated_data['min_order_quantity'] = Decimal('1')
+            validated_data['min_order_quantity'] = _DEFAULT_MIN_ORDER_QUANTITY
 
         if unit_val and unit_val == 'QUINTAL':
-            # convert available quantity (quintals -> kg)
-            aq = validated_data.get('quantity_available')
-            if aq is not None:
-                try:
-                    validated_data['quantity_available'] = Decimal(str(aq)) * Decimal('100')
-                except Exception:
-                    pass
-
-            # convert price_per_unit (price per quintal -> price per kg)
-            pp = validated_data.get('price_per_unit')
-            if pp is not None:
-                try:
-                    # keep two decimal places for price
-                    validated_data['price_per_unit'] = (Decimal(str(pp)) / Decimal('100')).quantize(Decimal('0.01'))
-                except Exception:
-                    pass
-
-            # convert min_order_quantity (seller provided unit -> KG)
-            moq = validated_data.get('min_order_quantity')
-            if moq is not None:
-                try:
-                    validated_data['min_order_quantity'] = Decimal(str(moq)) * Decimal('100')
-                except Exception:
-                    pass
-
-            # store normalized unit as kilograms
-            validated_data['unit'] = 'KG'
-
-        product = Product.objects.create(**validated_data)
+            _convert_quintal_to_kg(validated_data)
 
         # attach location - location is required, so always provided
-        product.latitude = location.get('latitude')
-        product.longitude = location.get('longitude')
-        product.city = location.get('city')
-        product.pincode = location.get('pincode')
+        validated_data['latitude'] = location.get('latitude')
+        validated_data['longitude'] = location.get('longitude')
+        validated_data['city'] = location.get('city')
+        validated_data['pincode'] = location.get('pincode')
         if buyer_visibility is not None:
-            product.buyer_category_visibility = buyer_visibility
-        
+            validated_data['buyer_category_visibility'] = buyer_visibility
+
         # Handle user-provided image URL
         if user_image_url and user_image_url.strip():
-            product.pexels_image_url = user_image_url.strip()
-        
-        product.save()
-
-        # Create images. Support two types for each entry:
-        # - Uploaded file objects (ImageField) or
-        # - Dicts with {'url': '<http(s)://...>', 'isPrimary': bool} as provided by some clients.
-        for img in images:
-            if isinstance(img, dict) and img.get('url'):
-                ProductImage.objects.create(
-                    product=product, 
-                    url=img['url'], 
-                    is_primary=img.get('isPrimary', False)
-                )
-            else:
-                # assume it's already a file-like object acceptable to ImageField
-                ProductImage.objects.create(product=product, image=img)
+            validated_data['pexels_image_url'] = user_image_url.strip()
+
+        # The product and its images are created together or not at all
+        with transaction.atomic():
+            product = Product.objects.create(**validated_data)
+
+            # Create images. Support two types for each entry:
+            # - Uploaded file objects (ImageField) or
+            # - Dicts with {'url': '<http(s)://...>', 'isPrimary': bool} as provided by some clients.
+            save_product_images(product, images)
 
         return product
 
 
-class ProductUpdateSerializer(serializers.ModelSerializer):
-    location = serializers.DictField(write_only=True, required=False)
+class ProductUpdateSerializer(CachedFieldsMixin, serializers.ModelSerializer):
+    location = ProductLocationSerializer(write_only=True, required=False)
     buyerCategoryVisibility = serializers.ListField(child=serializers.CharField(), required=False)
     images = serializers.ListField(child=ImageOrUrlField(), write_only=True, required=False)
     # CamelCase aliases accepted from some clients (write-only aliases mapped in update())
@@ -488,28 +616,27 @@ class ProductUpdateSerializer(serializers.ModelSerializer):
         # Validate quantity fields if provided
         aq = data.get('available_quantity') or data.get('availableQuantity')
         if aq is not None:
-            try:
-                if float(aq) < 0:
-                    raise serializers.ValidationError({'availableQuantity': 'Available quantity must be >= 0'})
-            except (TypeError, ValueError):
+            aq = _as_decimal(aq)
+            if aq is None:
                 raise serializers.ValidationError({'availableQuantity': 'Invalid number format'})
+            if aq < 0:
+                raise serializers.ValidationError({'availableQuantity': 'Available quantity must be >= 0'})
 
         pp = data.get('price_per_unit') or data.get('pricePerUnit')
         if pp is not None:
-            try:
-                if float(pp) < 0:
-                    raise serializers.ValidationError({'pricePerUnit': 'Price per unit must be >= 0'})
-            except (TypeError, ValueError):
+            pp = _as_decimal(pp)
+            if pp is None:
                 raise serializers.ValidationError({'pricePerUnit': 'Invalid number format'})
+            if pp < 0:
+                raise serializers.ValidationError({'pricePerUnit': 'Price per unit must be >= 0'})
         
         # Validate category - convert category name to Category instance
         category_name = data.get('category')
         if category_name:
-            try:
-                category = Category.objects.get(name__iexact=category_name.strip(), is_active=True)
-                data['category'] = category
-            except Category.DoesNotExist:
+            category = Category.active_by_name().get(category_name.strip().lower())
+            if category is None:
                 raise serializers.ValidationError({'category': f'Category "{category_name}" not found. Please ensure the category exists and is active.'})
+            data['category'] = category
         
         return data
 
@@ -520,21 +647,7 @@ class ProductUpdateSerializer(serializers.ModelSerializer):
         user_image_url = validated_data.pop('pexelsImageUrl', None)
 
         # map camelCase aliases
-        if 'availableQuantity' in validated_data:
-            validated_data['quantity_available'] = validated_data.pop('availableQuantity')
-        if 'quantityUnit' in validated_data:
-            validated_data['unit'] = _normalize_unit(validated_data.pop('quantityUnit'))
-        if 'pricePerUnit' in validated_data:
-            validated_data['price_per_unit'] = validated_data.pop('pricePerUnit')
-        if 'priceCurrency' in validated_data:
-            validated_data['price_currency'] = validated_data.pop('priceCurrency')
-        if 'priceType' in validated_data:
-            validated_data['price_type'] = validated_data.pop('priceType')
-        if 'marketPriceSource' in validated_data:
-            validated_data['market_price_source'] = validated_data.pop('marketPriceSource')
-        # accept minOrderQuantity (camelCase) from some clients and map to DB field
-        if 'minOrderQuantity' in validated_data:
-            validated_data['min_order_quantity'] = validated_data.pop('minOrderQuantity')
+        _map_field_aliases(validated_data)
         
         # Handle user-provided image URL
         if user_image_url is not None:
@@ -551,61 +664,34 @@ class ProductUpdateSerializer(serializers.ModelSerializer):
 
         # Ensure min_order_quantity defaults to 1 in the seller provided unit if not supplied
         if 'min_order_quantity' not in validated_data or validated_data.get('min_order_quantity') is None:
-            validated_data['min_order_quantity'] = Decimal('1')
+            validated_data['min_order_quantity'] = _DEFAULT_MIN_ORDER_QUANTITY
 
         if unit_val and unit_val == 'QUINTAL':
-            # convert available_quantity if present
-            aq = validated_data.get('quantity_available')
-            if aq is not None:
-                try:
-                    validated_data['quantity_available'] = Decimal(str(aq)) * Decimal('100')
-                except Exception:
-                    pass
-
-            # convert price_per_unit if present (per quintal -> per kg)
-            pp = validated_data.get('price_per_unit')
-            if pp is not None:
-                try:
-                    validated_data['price_per_unit'] = (Decimal(str(pp)) / Decimal('100')).quantize(Decimal('0.01'))
-                except Exception:
-                    pass
-
-            # convert min_order_quantity if present
-            moq = validated_data.get('min_order_quantity')
-            if moq is not None:
-                try:
-                    validated_data['min_order_quantity'] = Decimal(str(moq)) * Decimal('100')
-                except Exception:
-                    pass
-
-            validated_data['unit'] = 'KG'
-
-        for attr, val in validated_data.items():
-            setattr(instance, attr, val)
+            _convert_quintal_to_kg(validated_data)
 
         # (min_order_quantity was defaulted earlier in the flow)
 
         if location:
-            instance.latitude = location.get('latitude', instance.latitude)
-            instance.longitude = location.get('longitude', instance.longitude)
-            instance.city = location.get('city', instance.city)
-            instance.pincode = location.get('pincode', instance.pincode)
+            # only the keys sent are changed
+            validated_data.update(location)
 
         if buyer_visibility is not None:
-            instance.buyer_category_visibility = buyer_visibility
-
-        instance.save()
-
-        if images is not None and images:
-            instance.images.all().delete()
-            for img in images:
-                if isinstance(img, dict) and img.get('url'):
-                    ProductImage.objects.create(
-                        product=instance, 
-                        url=img['url'], 
-                        is_primary=img.get('isPrimary', False)
-                    )
-                else:
-                    ProductImage.objects.create(product=instance, image=img)
+            validated_data['buyer_category_visibility'] = buyer_visibility
+
+        for attr, val in validated_data.items():
+            setattr(instance, attr, val)
+
+        with transaction.atomic():
+            # Write only the columns this request changed (updated_at is not
+            # refreshed by auto_now unless listed)
+            instance.save(update_fields=[*validated_data, 'updated_at'])
+
+            if images is not None and images:
+                # Replace the old images. Their delete signals still run, but the
+                # primary_image_url refresh is left to save_product_images, which
+                # does it once
+                with defer_primary_image_refresh(instance.pk):
+                    ProductImage.objects.filter(product=instance).delete()
+                save_product_images(instance, images)
 
         return instance
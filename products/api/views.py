@@ -2,31 +2,37 @@ from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.pagination import PageNumberPagination
 from django.db import models
-from django.db.models import Q
+from django.db.models import Count, ExpressionWrapper, FloatField, Q, Value
+from django.db.models.functions import ATan2, Cast, Cos, Greatest, Least, Power, Radians, Sin, Sqrt
 from django.shortcuts import get_object_or_404
 from django.core.cache import cache
 import math
 import logging
-from ..models import Product, Category, ProductImage
+from ..models import Product, Category, ProductImage, CATEGORY_LIST_CACHE_KEY, CATEGORY_LIST_CACHE_TIMEOUT
 from .serializers import (
-    ProductListSerializer, ProductCreateSerializer, ProductUpdateSerializer
+    ProductListSerializer, ProductCreateSerializer, ProductUpdateSerializer, PRODUCT_LIST_FIELDS,
+    product_images_prefetch,
+    # Allowed buyer categories, shared with serializer validation (values come from
+    # users.models.CustomUser.BUYER_CATEGORY_CHOICES: 'mandi_owner','shopkeeper','community')
+    ALLOWED_BUYER_CATEGORIES, SORTED_BUYER_CATEGORIES
 )
-import json
-from django.db import connection
+import copy
+import orjson
+from django.db import close_old_connections, connection
 from django.db.utils import DatabaseError
 import os
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import threading
 from django.conf import settings
 from drf_spectacular.utils import extend_schema
-from ..services import pexels_service
+from ..services import pexels_service, fetch_product_image_later
 
 logger = logging.getLogger(__name__)
 
-# Allowed buyer categories (must match serializer allowed set and users.BUYER_CATEGORY_CHOICES)
-# Note: values come from users.models.CustomUser.BUYER_CATEGORY_CHOICES: 'mandi_owner','shopkeeper','community'
-ALLOWED_BUYER_CATEGORIES = {'mandi_owner', 'shopkeeper', 'community'}
-
 
 def haversine_distance(lat1, lon1, lat2, lon2):
     # Returns distance in meters
@@ -39,10 +45,39 @@ def haversine_distance(lat1, lon1, lat2, lon2):
     dlambda = math.radians(lon2 - lon1)
 
     a = math.sin(dphi/2)**2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda/2)**2
+    # Rounding can leave a just outside [0, 1] for near-antipodal points
+    a = min(max(a, 0.0), 1.0)
     c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
     return int(R * c)
 
 
+def haversine_distance_expression(lat, lon):
+    """Database expression for haversine_distance from (lat, lon) to each product, in meters.
+
+    Not truncated to whole meters; int() the annotated value to match haversine_distance.
+    """
+    lat1, lon1 = float(lat), float(lon)
+    R = 6371000  # Earth radius in meters
+    lat2 = Cast('latitude', FloatField())
+    lon2 = Cast('longitude', FloatField())
+    dphi = Radians(lat2 - lat1)
+    dlambda = Radians(lon2 - lon1)
+
+    a = Power(Sin(dphi / 2), 2) + math.cos(math.radians(lat1)) * Cos(Radians(lat2)) * Power(Sin(dlambda / 2), 2)
+    # Rounding can leave a just outside [0, 1] for near-antipodal points, and
+    # Postgres raises on the square root of a negative number
+    a = Least(Greatest(a, Value(0.0)), Value(1.0))
+    c = 2 * ATan2(Sqrt(a), Sqrt(1 - a))
+    return ExpressionWrapper(R * c, output_field=FloatField())
+
+
+class SellerProductsPagination(PageNumberPagination):
+    """Optional pagination for a seller's products, with list_products' page/limit parameters"""
+    page_size = 20
+    page_size_query_param = 'limit'
+    max_page_size = 100
+
+
 @extend_schema(operation_id='seller-products-list', responses={200: ProductListSerializer(many=True)})
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
@@ -54,11 +89,59 @@ def get_seller_products(request):
     if request.user.user_type != 'smart_seller' and not getattr(request.user, 'is_staff', False):
         return Response({'error': {'code': 'FORBIDDEN', 'message': 'Only smart_seller accounts may access seller products'}}, status=status.HTTP_403_FORBIDDEN)
 
-    products = Product.objects.filter(seller=request.user).prefetch_related('images')
+    products = Product.objects.filter(seller=request.user).select_related('seller', 'category').only(*PRODUCT_LIST_FIELDS).prefetch_related(product_images_prefetch())
+    # Clients asking for a page get just that page (COUNT plus LIMIT/OFFSET);
+    # without one, every product is returned as before
+    if 'page' in request.query_params:
+        paginator = SellerProductsPagination()
+        page = paginator.paginate_queryset(products, request)
+        serializer = ProductListSerializer(page, many=True)
+        return Response({
+            'items': serializer.data,
+            'totalCount': paginator.page.paginator.count,
+            'page': paginator.page.number,
+            'limit': paginator.get_page_size(request),
+        })
     serializer = ProductListSerializer(products, many=True)
+    # the queryset was evaluated by the serializer, so this counts it in memory
     return Response({'items': serializer.data, 'totalCount': products.count()})
 
 
+def _request_data_with_images(request):
+    """request.data with 'images' set to the JSON image objects sent, then the uploaded files.
+
+    Image objects may arrive as dicts (JSON body) or JSON-encoded strings
+    (multipart); other strings are skipped. The copy is shallow: QueryDict.copy()
+    would deep-copy every value, uploaded files included.
+    """
+    data = copy.copy(request.data)
+    # request.FILES may contain multiple files under the 'images' key (multipart/form-data)
+    files = request.FILES.getlist('images')
+    if hasattr(data, 'getlist'):
+        raw_images = data.getlist('images')
+    else:
+        raw_images = data.get('images') or []
+        if not isinstance(raw_images, (list, tuple)):
+            raw_images = [raw_images]
+    images = []
+    for it in raw_images:
+        if isinstance(it, str):
+            try:
+                images.append(orjson.loads(it))
+            except orjson.JSONDecodeError:
+                # skip non-json strings
+                continue
+        elif isinstance(it, dict):
+            images.append(it)
+        # anything else is an uploaded file, added from request.FILES below
+    images += files
+    if hasattr(data, 'setlist'):
+        data.setlist('images', images)
+    else:
+        data['images'] = images
+    return data
+
+
 @extend_schema(request=ProductCreateSerializer, responses={201: ProductListSerializer})
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
@@ -71,53 +154,18 @@ def add_product(request):
         return Response({'error': {'code': 'FORBIDDEN', 'message': 'Only smart_seller accounts may create products'}}, status=status.HTTP_403_FORBIDDEN)
 
     # Prepare data for serializer - combine JSON image objects with uploaded files
-    data = request.data.copy()
-    # request.FILES may contain multiple files under the 'images' key (multipart/form-data)
-    files = request.FILES.getlist('images') if hasattr(request, 'FILES') else []
-    # Ensure images key is a list; if provided in JSON, extend it with file objects
-    images_json = []
-    try:
-        raw_images = data.get('images') or []
-        # request.data may return a single string, a list of strings, or already parsed dicts
-        if isinstance(raw_images, (list, tuple)):
-            images_json = list(raw_images)
-        else:
-            images_json = [raw_images]
-    except Exception:
-        images_json = []
-    # Try to parse any JSON-encoded strings into dicts (common when sending JSON in multipart)
-    parsed_images = []
-    for it in images_json:
-        if isinstance(it, str):
-            try:
-                cand = json.loads(it)
-                parsed_images.append(cand)
-            except Exception:
-                # skip non-json strings
-                continue
-        elif isinstance(it, dict):
-            parsed_images.append(it)
-        else:
-            # ignore other types here (files are handled separately)
-            continue
-    images_json = parsed_images
-    # Append uploaded files to the images list so serializer.create handles them
-    images_combined = images_json + files
-    data.setlist('images', images_combined) if hasattr(data, 'setlist') else data.__setitem__('images', images_combined)
+    data = _request_data_with_images(request)
 
     serializer = ProductCreateSerializer(data=data)
     if serializer.is_valid():
         product = serializer.save(seller=request.user)
         
-        # Only fetch Pexels image if user didn't provide their own image URL
+        # Only fetch Pexels image if user didn't provide their own image URL;
+        # it is looked up in the background and appears on later reads
         user_provided_image = 'pexelsImageUrl' in data and data.get('pexelsImageUrl')
         if not user_provided_image and pexels_service.is_configured() and not product.pexels_image_url:
-            try:
-                pexels_service.get_or_fetch_product_image(product)
-            except Exception as e:
-                # Log error but don't fail the product creation
-                logger.error(f"Error fetching Pexels image for product {product.title}: {e}")
-        
+            fetch_product_image_later(product)
+
         return Response(ProductListSerializer(product).data, status=status.HTTP_201_CREATED)
 
     return Response({'error': {'code': 'VALIDATION_ERROR', 'message': 'Validation failed', 'details': serializer.errors}}, status=status.HTTP_400_BAD_REQUEST)
@@ -138,71 +186,21 @@ def update_product(request, uuid):
         return Response({'error': {'code': 'FORBIDDEN', 'message': 'Only smart_seller accounts may update products'}}, status=status.HTTP_403_FORBIDDEN)
 
     # Combine uploaded files with any JSON images provided in the payload
-    data = request.data.copy()
-    files = request.FILES.getlist('images') if hasattr(request, 'FILES') else []
-    images_json = []
-    try:
-        raw_images = data.get('images') or []
-        if isinstance(raw_images, (list, tuple)):
-            images_json = list(raw_images)
-        else:
-            images_json = [raw_images]
-    except Exception:
-        images_json = []
-    parsed_images = []
-    for it in images_json:
-        if isinstance(it, str):
-            try:
-                cand = json.loads(it)
-                parsed_images.append(cand)
-            except Exception:
-                continue
-        elif isinstance(it, dict):
-            parsed_images.append(it)
-        else:
-            continue
-    images_json = parsed_images
-    images_combined = images_json + files
-    data.setlist('images', images_combined) if hasattr(data, 'setlist') else data.__setitem__('images', images_combined)
+    data = _request_data_with_images(request)
 
     serializer = ProductUpdateSerializer(product, data=data, partial=True)
     if serializer.is_valid():
         # Check if user provided an image URL
         user_provided_image = 'pexelsImageUrl' in data
-        
-        # Check if title or category was updated - if so, might need new image
-        title_changed = 'title' in data and data.get('title') != product.title
-        
-        # Check if category changed by comparing category names
-        category_changed = False
-        if 'category' in data:
-            old_category_name = product.category.name if product.category else None
-            # Get the new category name from the validated data in the serializer
-            new_category = serializer.validated_data.get('category')
-            new_category_name = new_category.name if new_category else None
-            category_changed = old_category_name != new_category_name
-        
+
         # Save the product first
         product = serializer.save()
-        
-        # Only fetch new image from Pexels if:
-        # 1. User did not provide their own image URL, AND
-        # 2. Either title/category changed OR no image exists
-        if not user_provided_image and pexels_service.is_configured():
-            if (title_changed or category_changed) and not product.pexels_image_url:
-                try:
-                    pexels_service.get_or_fetch_product_image(product)
-                except Exception as e:
-                    # Log error but don't fail the product update
-                    logger.error(f"Error fetching Pexels image for product {product.title}: {e}")
-            elif not product.pexels_image_url:
-                # If no image exists, try to fetch one regardless of changes
-                try:
-                    pexels_service.get_or_fetch_product_image(product)
-                except Exception as e:
-                    # Log error but don't fail the product update
-                    logger.error(f"Error fetching Pexels image for product {product.title}: {e}")
-        
+
+        # Fetch an image from Pexels (in the background) if the user did not
+        # provide their own image URL and the product has no image
+        if not user_provided_image and pexels_service.is_configured() and not product.pexels_image_url:
+            fetch_product_image_later(product)
+
         return Response(ProductListSerializer(product).data)
 
     return Response({'error': {'code': 'VALIDATION_ERROR', 'message': 'Validation failed', 'details': serializer.errors}}, status=status.HTTP_400_BAD_REQUEST)
@@ -247,7 +245,7 @@ def get_products_by_buyer_type(request):
     if request.user.user_type != 'smart_seller' and not getattr(request.user, 'is_staff', False):
         return Response({'error': {'code': 'FORBIDDEN', 'message': 'Only smart_seller accounts may access this resource'}}, status=status.HTTP_403_FORBIDDEN)
 
-    products = Product.objects.filter(seller=request.user, is_published=True).prefetch_related('images')
+    products = Product.objects.filter(seller=request.user, is_published=True).select_related('seller', 'category').only(*PRODUCT_LIST_FIELDS).prefetch_related(product_images_prefetch())
 
     # Serialize all seller products once, then group them in-memory so that a product
     # that lists multiple buyer categories appears in every corresponding bucket.
@@ -256,20 +254,15 @@ def get_products_by_buyer_type(request):
     # all_buyers: those with any buyer_category_visibility set (non-empty)
     all_buyers = [p for p in serialized if p.get('buyerCategoryVisibility')]
 
-    # Initialize buckets
-    by_type = {cat: [] for cat in ALLOWED_BUYER_CATEGORIES}
+    # Each product's categories as a set (anything but a list counts as none),
+    # so that every bucket is one membership-test pass over the products
+    visibility = []
+    for p in serialized:
+        vis = p.get('buyerCategoryVisibility')
+        visibility.append((p, frozenset(vis) if isinstance(vis, (list, tuple)) else frozenset()))
 
     # Fill buckets: each product may belong to multiple categories
-    for p in serialized:
-        vis = p.get('buyerCategoryVisibility') or []
-        # ensure we iterate a list-like structure
-        try:
-            iter(vis)
-        except TypeError:
-            continue
-        for cat in vis:
-            if cat in by_type:
-                by_type[cat].append(p)
+    by_type = {cat: [p for p, cats in visibility if cat in cats] for cat in SORTED_BUYER_CATEGORIES}
 
     return Response({
         'all_buyers': all_buyers,
@@ -288,7 +281,7 @@ def get_product_detail(request, uuid):
     if request.user.user_type != 'smart_buyer' and not getattr(request.user, 'is_staff', False):
         return Response({'error': {'code': 'FORBIDDEN', 'message': 'Only smart_buyer accounts may access product details'}}, status=status.HTTP_403_FORBIDDEN)
     """Public product detail. Enforce buyer visibility if necessary."""
-    product = get_object_or_404(Product.objects.prefetch_related('images'), uuid=uuid, is_published=True)
+    product = get_object_or_404(Product.objects.select_related('seller', 'category').only(*PRODUCT_LIST_FIELDS).prefetch_related(product_images_prefetch()), uuid=uuid, is_published=True)
 
     # buyerCategory can be provided by authenticated token or query param
     buyer_category = None
@@ -412,49 +405,146 @@ def list_products(request):
         except DatabaseError:
             qs = qs.filter(buyer_category_visibility__icontains=f'"{buyerCategory}"')
 
-    # Precompute distances if lat/lon provided
-    items = list(qs.prefetch_related('images'))
-
+    # Distance filtering, sorting and paging all happen in the database; only
+    # the requested page of products is loaded
+    located = False
     if lat and lon:
         try:
             latf = float(lat); lonf = float(lon)
-            new_items = []
-            for it in items:
-                if it.latitude is None or it.longitude is None:
-                    continue
-                d = haversine_distance(latf, lonf, it.latitude, it.longitude)
-                if maxDistance and d > int(maxDistance):
-                    continue
-                it._distance = d
-                new_items.append(it)
-            items = new_items
-            if sortBy == 'distance':
-                items.sort(key=lambda x: getattr(x, '_distance', 0))
+            max_distance = int(maxDistance) if maxDistance else None
         except Exception:
             pass
+        else:
+            qs = qs.filter(latitude__isnull=False, longitude__isnull=False).annotate(
+                distance=haversine_distance_expression(latf, lonf)
+            )
+            located = True
+            if max_distance is not None:
+                # distances are reported in whole meters, rounded down
+                qs = qs.filter(distance__lt=max_distance + 1)
+            if sortBy == 'distance':
+                qs = qs.order_by('distance', '-created_at')
 
     # other sorts
     if sortBy == 'price':
-        items.sort(key=lambda x: x.price_per_unit)
+        qs = qs.order_by('price_per_unit', '-created_at')
     elif sortBy == 'createdAt':
-        items.sort(key=lambda x: x.created_at, reverse=True)
+        qs = qs.order_by('-created_at')
 
-    total = len(items)
+    total = qs.count()
     start = (page-1)*limit
     end = start+limit
-    paged = items[start:end]
+    paged = []
+    if start >= 0 and end > start:
+        paged = list(qs.select_related('seller', 'category').only(*PRODUCT_LIST_FIELDS).prefetch_related(product_images_prefetch())[start:end])
 
     # serialize and attach distanceMeters
     serialized = ProductListSerializer(paged, many=True).data
-    if lat and lon:
+    if located:
         for idx, obj in enumerate(paged):
-            d = getattr(obj, '_distance', None)
-            if d is not None:
-                serialized[idx]['distanceMeters'] = d
+            serialized[idx]['distanceMeters'] = int(obj.distance)
 
     return Response({'items': serialized, 'totalCount': total, 'page': page, 'limit': limit})
 
 
+# Resource: Current Daily Price of Various Commodities from Various Markets (Mandi)
+MANDI_PRICES_URL = 'https://api.data.gov.in/resource/9ef84268-d588-465a-a308-a864a43d0070'
+MANDI_CACHE_TIMEOUT = 600  # served as fresh for 10 minutes
+MANDI_STALE_CACHE_TIMEOUT = 24 * 60 * 60  # then served while refreshing, for up to a day
+MANDI_STALE_SUFFIX = ':stale'
+MANDI_REFRESH_LOCK_SUFFIX = ':refreshing'
+MANDI_REFRESH_LOCK_TIMEOUT = 30
+
+# Shared by every data.gov.in call so requests reuse kept-alive TLS connections.
+# Failed connections are retried; reads are not, so a slow upstream still
+# answers within one timeout.
+_MANDI_SESSION = requests.Session()
+_MANDI_SESSION.mount('https://', HTTPAdapter(
+    pool_connections=1,
+    pool_maxsize=32,
+    max_retries=Retry(total=2, read=0, backoff_factor=0.2)
+))
+
+
+def _fetch_mandi_records(params):
+    """Fetch mandi price records from data.gov.in; raises when the upstream call fails"""
+    # Reduce timeout to 5 seconds for faster response
+    resp = _MANDI_SESSION.get(MANDI_PRICES_URL, params=params, timeout=5)
+    if resp.status_code != 200:
+        # include downstream body message when possible
+        reason = None
+        try:
+            reason = orjson.loads(resp.content)
+        except Exception:
+            reason = resp.text
+        raise RuntimeError(f'data.gov.in returned status {resp.status_code}: {reason}')
+    j = orjson.loads(resp.content)
+    return j.get('records') or []
+
+
+def _mandi_price_summary(commodity, city, records):
+    """Response body for get_mandi_prices: the records' prices (per quintal) as a per-kg market list"""
+    def per_kg(x):
+        try:
+            if x is None:
+                return None
+            return round(float(x) / 100.0, 2)
+        except Exception:
+            return None
+
+    simple_markets = []
+    for r in records:
+        modal = r.get('modal_price') or r.get('modalPrice')
+        min_p = r.get('min_price') or r.get('minPrice')
+        max_p = r.get('max_price') or r.get('maxPrice')
+
+        # prefer modal, else use avg(min,max), else None
+        price_per_q = None
+        try:
+            if modal:
+                price_per_q = float(modal)
+            elif min_p and max_p:
+                price_per_q = (float(min_p) + float(max_p)) / 2.0
+        except Exception:
+            price_per_q = None
+
+        price_per_kg = per_kg(price_per_q)
+
+        simple_markets.append({
+            'market': r.get('market'),
+            'state': r.get('state'),
+            'district': r.get('district'),
+            'pricePerKg': price_per_kg,
+        })
+
+    return {
+        'commodity': commodity,
+        'city': city,
+        'markets': simple_markets,
+        'count': len(simple_markets),
+    }
+
+
+def _cache_mandi_prices(cache_key, result):
+    """Cache a get_mandi_prices result as fresh, and as the stale fallback for later"""
+    cache.set(cache_key, result, MANDI_CACHE_TIMEOUT)
+    cache.set(cache_key + MANDI_STALE_SUFFIX, result, MANDI_STALE_CACHE_TIMEOUT)
+
+
+def _refresh_mandi_prices(cache_key, params, commodity, city):
+    """Re-fetch a stale get_mandi_prices result in the background"""
+    try:
+        records = _fetch_mandi_records(params)
+        if records:
+            _cache_mandi_prices(cache_key, _mandi_price_summary(commodity, city, records))
+    except Exception as e:
+        logger.warning(f"Refreshing mandi prices for {cache_key} failed: {e}")
+    finally:
+        cache.delete(cache_key + MANDI_REFRESH_LOCK_SUFFIX)
+        # The cache is in the database; release this thread's connection
+        close_old_connections()
+
+
 @extend_schema(responses={200: dict})
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
@@ -479,17 +569,13 @@ def get_mandi_prices(request):
     commodity = commodity.strip()
     city = city.strip()
     
-    # Check cache first to improve response time (cache for 10 minutes)
+    # Check cache first to improve response time (fresh for 10 minutes)
     state_param = request.GET.get('state')
     cache_key = f"mandi_price_{commodity.lower()}_{city.lower()}_{state_param.lower() if state_param else 'none'}"
     cached_result = cache.get(cache_key)
     if cached_result:
         return Response(cached_result, headers={'Content-Type': 'application/json'})
 
-    # Attempt to fetch live mandi prices from data.gov.in resource
-    # Resource: Current Daily Price of Various Commodities from Various Markets (Mandi)
-    resource_id = '9ef84268-d588-465a-a308-a864a43d0070'
-
     # Allow callers to override api key for debugging via query param 'api_key' or 'apikey'.
     api_key = (request.GET.get('api_key') or request.GET.get('apikey') or
                os.environ.get('MANDI_API_KEY') or getattr(settings, 'MANDI_API_KEY', None))
@@ -507,74 +593,30 @@ def get_mandi_prices(request):
     # because that often results in no matches (state != district). If callers
     # want to filter by state, they can pass a separate 'state' query param.
     params['filters[district]'] = city
-    state_param = request.GET.get('state')
     if state_param:
         params['filters[state]'] = state_param.strip()
 
+    # An expired result is still served, while one request's worth of refresh
+    # runs in the background (cache.add on the shared cache lets only one
+    # request across all workers start it)
+    stale_result = cache.get(cache_key + MANDI_STALE_SUFFIX)
+    if stale_result:
+        if cache.add(cache_key + MANDI_REFRESH_LOCK_SUFFIX, 1, MANDI_REFRESH_LOCK_TIMEOUT):
+            threading.Thread(
+                target=_refresh_mandi_prices, args=(cache_key, params, commodity, city), daemon=True
+            ).start()
+        return Response(stale_result, headers={'Content-Type': 'application/json'})
+
     try:
-        url = f'https://api.data.gov.in/resource/{resource_id}'
-        # Reduce timeout to 5 seconds for faster response
-        resp = requests.get(url, params=params, timeout=5)
-        if resp.status_code != 200:
-            # include downstream body message when possible
-            reason = None
-            try:
-                reason = resp.json()
-            except Exception:
-                reason = resp.text
-            raise RuntimeError(f'data.gov.in returned status {resp.status_code}: {reason}')
-        j = resp.json()
-        records = j.get('records') or []
+        records = _fetch_mandi_records(params)
     except Exception as e:
         return Response({'error': {'code': 'NOT_AVAILABLE', 'message': 'No mandi price available or upstream fetch failed', 'reason': str(e)}}, status=status.HTTP_502_BAD_GATEWAY, headers={'Content-Type': 'application/json'})
 
     if not records:
         return Response({'error': {'code': 'NOT_AVAILABLE', 'message': 'No mandi price records found for commodity and city'}}, status=status.HTTP_404_NOT_FOUND, headers={'Content-Type': 'application/json'})
 
-    # Convert returned prices (per quintal) to a simplified per-kg market list
-    def per_kg(x):
-        try:
-            if x is None:
-                return None
-            return round(float(x) / 100.0, 2)
-        except Exception:
-            return None
-
-    simple_markets = []
-    for r in records:
-        modal = r.get('modal_price') or r.get('modalPrice')
-        min_p = r.get('min_price') or r.get('minPrice')
-        max_p = r.get('max_price') or r.get('maxPrice')
-
-        # prefer modal, else use avg(min,max), else None
-        price_per_q = None
-        try:
-            if modal:
-                price_per_q = float(modal)
-            elif min_p and max_p:
-                price_per_q = (float(min_p) + float(max_p)) / 2.0
-        except Exception:
-            price_per_q = None
-
-        price_per_kg = per_kg(price_per_q)
-
-        simple_markets.append({
-            'market': r.get('market'),
-            'state': r.get('state'),
-            'district': r.get('district'),
-            'pricePerKg': price_per_kg,
-        })
-
-    # final response
-    resp = {
-        'commodity': commodity,
-        'city': city,
-        'markets': simple_markets,
-        'count': len(simple_markets),
-    }
-
-    # Cache the result for 10 minutes (600 seconds) to improve performance
-    cache.set(cache_key, resp, 600)
+    resp = _mandi_price_summary(commodity, city, records)
+    _cache_mandi_prices(cache_key, resp)
 
     return Response(resp, headers={'Content-Type': 'application/json'})
 
@@ -614,7 +656,7 @@ def get_product_distance(request, uuid):
     except Exception:
         return Response({'error': {'code': 'VALIDATION_ERROR', 'message': 'invalid latitude/longitude'}}, status=status.HTTP_400_BAD_REQUEST)
 
-    product = get_object_or_404(Product, uuid=uuid)
+    product = get_object_or_404(Product.objects.only('uuid', 'latitude', 'longitude'), uuid=uuid)
     if product.latitude is None or product.longitude is None:
         return Response({'error': {'code': 'NOT_AVAILABLE', 'message': 'Product has no location coordinates'}}, status=status.HTTP_404_NOT_FOUND)
 
@@ -634,12 +676,19 @@ import base64
 @permission_classes([AllowAny])
 def list_categories(request):
     """List all active categories (public endpoint)"""
-    categories = Category.objects.filter(is_active=True).order_by('name')
-    serializer = CategoryListSerializer(categories, many=True)
-    return Response({
-        'success': True,
-        'categories': serializer.data
-    })
+    # Served from the cache until a category or product changes
+    payload = cache.get(CATEGORY_LIST_CACHE_KEY)
+    if payload is None:
+        categories = Category.objects.filter(is_active=True).annotate(
+            published_product_count=Count('products', filter=Q(products__is_published=True))
+        ).order_by('name')
+        serializer = CategoryListSerializer(categories, many=True)
+        payload = {
+            'success': True,
+            'categories': serializer.data
+        }
+        cache.set(CATEGORY_LIST_CACHE_KEY, payload, CATEGORY_LIST_CACHE_TIMEOUT)
+    return Response(payload)
 
 
 class CategoryAdminPermissionMixin:
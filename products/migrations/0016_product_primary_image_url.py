@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-16 18:23
+
+from django.db import migrations, models
+
+
+def backfill_primary_image_url(apps, schema_editor):
+    Product = apps.get_model('products', 'Product')
+    ProductImage = apps.get_model('products', 'ProductImage')
+
+    primary_urls = {}
+    for image in ProductImage.objects.order_by('product_id', '-is_primary', 'id').iterator():
+        if image.product_id in primary_urls:
+            continue
+        if image.image:
+            primary_urls[image.product_id] = image.image.url
+        elif image.url:
+            primary_urls[image.product_id] = image.url
+        else:
+            primary_urls[image.product_id] = ''
+
+    for product_id, url in primary_urls.items():
+        if url:
+            Product.objects.filter(pk=product_id).update(primary_image_url=url)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0015_alter_product_min_order_quantity'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='primary_image_url',
+            field=models.CharField(blank=True, default='', help_text='URL of the primary (or first) uploaded image, kept in sync from ProductImage.', max_length=500),
+        ),
+        migrations.RunPython(backfill_primary_image_url, reverse_code=migrations.RunPython.noop),
+    ]
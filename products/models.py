@@ -3,6 +3,11 @@ from django.contrib.auth import get_user_model
 from PIL import Image
 import uuid
 from django.db.models import JSONField
+from django.db.models.functions import Upper
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVector
+from django.utils.functional import cached_property
+from django.core.cache import cache
 
 # Get the custom user model (or default User if not customized)
 User = get_user_model()
@@ -16,6 +21,39 @@ UNIT_CHOICES = (
     ('UNIT', 'Per Piece/Unit'),
 )
 
+# Full-text document for the admin product search. The GIN index in Product.Meta
+# is built on this exact expression, so queries must use it unchanged for the
+# planner to match the index.
+PRODUCT_SEARCH_VECTOR = SearchVector('title', 'crop', 'variety', 'description', config='simple')
+
+# Category.active_by_name() caches its lookup table under this key; the
+# Category signals in products.signals delete it on every change. The cache is
+# shared by all workers, so a rename or deactivation reaches every one of them.
+ACTIVE_CATEGORIES_CACHE_KEY = 'active_categories_by_name'
+ACTIVE_CATEGORIES_CACHE_TIMEOUT = 300  # 5 minutes
+# The public category listing (with published product counts) is cached under
+# this key; the Category and Product signals delete it from the shared cache on
+# every change, so no worker keeps serving the old listing
+CATEGORY_LIST_CACHE_KEY = 'category_list'
+CATEGORY_LIST_CACHE_TIMEOUT = 300  # 5 minutes
+
+# Target buyer entries as returned by the admin product API, built once and
+# shared by every Product.target_buyer_list
+TARGET_BUYER_ENTRIES = (
+    ('target_mandi_owners', {'type': 'mandi_owner', 'displayName': 'Mandi Owners', 'enabled': True}),
+    ('target_shopkeepers', {'type': 'shopkeeper', 'displayName': 'Shopkeepers', 'enabled': True}),
+    ('target_communities', {'type': 'community', 'displayName': 'Communities', 'enabled': True}),
+)
+ALL_BUYERS_ENTRY = {'type': 'all', 'displayName': 'All Buyers', 'enabled': True}
+# Display string for every (mandi owners, shopkeepers, communities) flag combination
+TARGET_BUYERS_DISPLAY = {
+    (mandi, shop, community): ', '.join(
+        entry['displayName']
+        for enabled, (_, entry) in zip((mandi, shop, community), TARGET_BUYER_ENTRIES) if enabled
+    ) or ALL_BUYERS_ENTRY['displayName']
+    for mandi in (False, True) for shop in (False, True) for community in (False, True)
+}
+
 
 class Category(models.Model):
     """Product categories like Fruits, Vegetables, Grains, etc."""
@@ -31,6 +69,15 @@ class Category(models.Model):
     def __str__(self):
         return self.name
 
+    @classmethod
+    def active_by_name(cls):
+        """Active categories keyed by lower-cased name, for resolving names sent by clients"""
+        categories = cache.get(ACTIVE_CATEGORIES_CACHE_KEY)
+        if categories is None:
+            categories = {category.name.lower(): category for category in cls.objects.filter(is_active=True)}
+            cache.set(ACTIVE_CATEGORIES_CACHE_KEY, categories, ACTIVE_CATEGORIES_CACHE_TIMEOUT)
+        return categories
+
 
 class Product(models.Model):
     """
@@ -50,6 +97,7 @@ class Product(models.Model):
     grade = models.CharField(max_length=50, blank=True, null=True, help_text="Grade/quality (e.g., A, B).")
     description = models.TextField(default='', help_text="Detailed description, quality, and farming methods.")
     pexels_image_url = models.URLField(blank=True, null=True, help_text="Image URL fetched from Pexels API based on product title.")
+    primary_image_url = models.CharField(max_length=500, blank=True, default='', help_text="URL of the primary (or first) uploaded image, kept in sync from ProductImage.")
     
     # 3. Pricing & Quantity
     quantity_available = models.DecimalField(max_digits=10, decimal_places=2, default=0, help_text="Total quantity available for sale.")
@@ -82,6 +130,25 @@ class Product(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        # Trigram indexes for the admin search. icontains compiles to
+        # UPPER(col) LIKE UPPER('%term%') on Postgres, so the indexes are on
+        # the same UPPER() expressions.
+        indexes = [
+            GinIndex(OpClass(Upper('title'), name='gin_trgm_ops'), name='product_title_trgm'),
+            GinIndex(OpClass(Upper('crop'), name='gin_trgm_ops'), name='product_crop_trgm'),
+            GinIndex(OpClass(Upper('variety'), name='gin_trgm_ops'), name='product_variety_trgm'),
+            GinIndex(OpClass(Upper('description'), name='gin_trgm_ops'), name='product_desc_trgm'),
+            GinIndex(PRODUCT_SEARCH_VECTOR, name='product_search_fts'),
+            # Default ordering and the admin list's created_at range filters
+            models.Index(fields=['-created_at'], name='product_created_at_idx'),
+            # Exact, case-insensitive crop and priceType filters of the public
+            # listing; iexact compiles to UPPER(col) = UPPER('value') on Postgres
+            models.Index(Upper('crop'), name='product_crop_upper_idx'),
+            models.Index(Upper('price_type'), name='product_price_type_upper_idx'),
+            # The public listing's published products, in the default order and sorted by price
+            models.Index(fields=['is_published', '-created_at'], name='product_published_created_idx'),
+            models.Index(fields=['is_published', 'price_per_unit'], name='product_published_price_idx'),
+        ]
 
     def __str__(self):
         return f"{self.title} ({self.seller.username})"
@@ -95,7 +162,9 @@ class Product(models.Model):
         - Set `unit` to 'KG'.
 
         This makes normalization idempotent for already-normalized records (unit == 'KG').
+        Fields rewritten here are added to `update_fields` when one is given.
         """
+        normalized = set()
         try:
             # Normalize the unit field to canonical uppercase choice values if possible
             if self.unit is not None:
@@ -114,6 +183,8 @@ class Product(models.Model):
                 else:
                     canonical = s.upper()
 
+                if canonical != self.unit:
+                    normalized.add('unit')
                 self.unit = canonical
 
             # Only perform conversion if unit is canonical 'QUINTAL'
@@ -140,10 +211,15 @@ class Product(models.Model):
 
                 # store as KG going forward
                 self.unit = 'KG'
+                normalized.update(('unit', 'quantity_available', 'min_order_quantity', 'price_per_unit'))
         except Exception:
             # on any unexpected issue, continue with default save to avoid blocking
             pass
 
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and normalized:
+            kwargs['update_fields'] = {*update_fields, *normalized}
+
         super().save(*args, **kwargs)
 
     @property
@@ -161,6 +237,20 @@ class Product(models.Model):
         else:
             return 'active'
 
+    @classmethod
+    def refresh_primary_image_url(cls, product_id):
+        """Recompute the denormalized primary_image_url for a product from its images"""
+        image = ProductImage.objects.filter(product_id=product_id).order_by('-is_primary', 'id').first()
+        url = ''
+        if image:
+            if image.image:
+                url = image.image.url
+            elif image.url:
+                url = image.url
+        # update() so unit normalization in save() and updated_at are not triggered
+        cls.objects.filter(pk=product_id).update(primary_image_url=url)
+        return url
+
     def soft_delete(self):
         """Soft-delete: keep row but mark unpublished and set a deleted flag via is_published."""
         self.is_published = False
@@ -186,14 +276,29 @@ class Product(models.Model):
     @property
     def target_buyers_display(self):
         """Get display string for target buyers"""
-        targets = []
-        if self.target_mandi_owners:
-            targets.append('Mandi Owners')
-        if self.target_shopkeepers:
-            targets.append('Shopkeepers')
-        if self.target_communities:
-            targets.append('Communities')
-        return ', '.join(targets) if targets else 'All Buyers'
+        return TARGET_BUYERS_DISPLAY[(
+            bool(self.target_mandi_owners),
+            bool(self.target_shopkeepers),
+            bool(self.target_communities),
+        )]
+
+    @cached_property
+    def target_buyer_list(self):
+        """Target buyer entries for the enabled flags, or 'All Buyers' when none are set"""
+        targets = [entry for flag, entry in TARGET_BUYER_ENTRIES if getattr(self, flag)]
+        return targets or [ALL_BUYERS_ENTRY]
+
+    @cached_property
+    def location_dict(self):
+        """Coordinates (as floats) with city and pincode, or None without coordinates"""
+        if self.latitude is None or self.longitude is None:
+            return None
+        return {
+            'latitude': float(self.latitude) if self.latitude else None,
+            'longitude': float(self.longitude) if self.longitude else None,
+            'city': self.city,
+            'pincode': self.pincode
+        }
     
 
 def product_image_upload_path(instance, filename):
@@ -3,7 +3,9 @@ Services for handling product-related operations including image fetching from P
 """
 import requests
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from django.conf import settings
+from django.db import close_old_connections, transaction
 from typing import Optional, List, Dict
 
 logger = logging.getLogger(__name__)
@@ -274,4 +276,32 @@ class PexelsImageService:
 
 
 # Create a singleton instance
-pexels_service = PexelsImageService()
\ No newline at end of file
+pexels_service = PexelsImageService()
+
+# Pexels lookups requested by the product views run on these threads, so the
+# API responds without waiting for Pexels
+_image_fetch_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='pexels-image-fetch')
+
+
+def _fetch_product_image(product_id):
+    """Look up and store a Pexels image for a product; runs on _image_fetch_executor"""
+    from .models import Product
+    try:
+        product = Product.objects.select_related('category').filter(id=product_id).first()
+        if product is not None:
+            pexels_service.get_or_fetch_product_image(product)
+    except Exception as e:
+        logger.error(f"Error fetching Pexels image for product {product_id}: {e}")
+    finally:
+        # The worker thread has its own connection; release it per CONN_MAX_AGE
+        close_old_connections()
+
+
+def fetch_product_image_later(product):
+    """
+    Fetch a Pexels image for product in the background, once the current
+    transaction (if any) has committed. The product's pexels_image_url is
+    filled in when the lookup finds one.
+    """
+    product_id = product.id
+    transaction.on_commit(lambda: _image_fetch_executor.submit(_fetch_product_image, product_id))
@@ -0,0 +1,59 @@
+"""
+Signals keeping denormalized product fields and cached category lookups in sync
+"""
+
+import contextlib
+import contextvars
+
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from django.core.cache import cache
+
+from .models import ACTIVE_CATEGORIES_CACHE_KEY, CATEGORY_LIST_CACHE_KEY, Category, Product, ProductImage
+
+
+# Products whose primary_image_url refresh is left to the code replacing their images
+_deferred_image_refresh = contextvars.ContextVar('deferred_image_refresh', default=frozenset())
+
+
+@contextlib.contextmanager
+def defer_primary_image_refresh(product_id):
+    """
+    Skip the per-image primary_image_url refresh for product_id inside the block;
+    the caller refreshes it once when it is done
+    """
+    token = _deferred_image_refresh.set(_deferred_image_refresh.get() | {product_id})
+    try:
+        yield
+    finally:
+        _deferred_image_refresh.reset(token)
+
+
+@receiver(post_save, sender=ProductImage)
+@receiver(post_delete, sender=ProductImage)
+def sync_product_primary_image_url(sender, instance, **kwargs):
+    """
+    Refresh Product.primary_image_url whenever one of its images is saved or deleted
+    """
+    if instance.product_id in _deferred_image_refresh.get():
+        return
+    Product.refresh_primary_image_url(instance.product_id)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def clear_active_categories_cache(sender, instance, **kwargs):
+    """
+    Drop the cached Category.active_by_name() table and category listing so the
+    next lookup rebuilds them
+    """
+    cache.delete_many([ACTIVE_CATEGORIES_CACHE_KEY, CATEGORY_LIST_CACHE_KEY])
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def clear_category_list_cache(sender, instance, **kwargs):
+    """
+    Drop the cached category listing, whose product counts may have changed
+    """
+    cache.delete(CATEGORY_LIST_CACHE_KEY)
@@ -0,0 +1,134 @@
+"""
+Background writer for AdminActionLog entries.
+
+Admin endpoints record every action for auditing, but the response does not
+need to wait for that INSERT. Entries are queued here and a single daemon
+thread per process writes them in batches with bulk_create.
+
+The queue lives in process memory. It is written out at a clean interpreter
+exit, but entries still queued when a worker is killed outright (SIGKILL, an
+out-of-memory kill, a gunicorn worker timeout) are lost; with the batching
+delay that is at most about a second's worth of admin actions.
+"""
+import atexit
+import logging
+import queue
+import threading
+
+from django.db import close_old_connections, transaction
+
+from .models import AdminActionLog
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 100
+FLUSH_INTERVAL = 1.0  # seconds to wait for more entries before writing a batch
+MAX_PENDING = 10000
+
+_pending = queue.Queue(maxsize=MAX_PENDING)
+_STOP = object()  # queued at exit to tell the writer to finish up
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def log_admin_action(admin_username, user, action, details=''):
+    """
+    Queue an AdminActionLog entry; it is written shortly after by the background writer
+
+    Args:
+        admin_username (str): Admin who performed the action (may be None)
+        user (CustomUser): User the action concerns
+        action (str): One of AdminActionLog.ACTION_CHOICES
+        details (str): Free-text description
+    """
+    entry = AdminActionLog(admin_username=admin_username, user=user, action=action, details=details)
+    try:
+        _pending.put_nowait(entry)
+    except queue.Full:
+        # Writer has fallen behind (e.g. database unavailable); don't grow without bound
+        _write([entry])
+        return
+    _ensure_writer()
+
+
+def flush():
+    """Write every queued entry now, in the calling thread"""
+    batch = []
+    while True:
+        try:
+            entry = _pending.get_nowait()
+        except queue.Empty:
+            break
+        if entry is _STOP:
+            continue
+        batch.append(entry)
+        if len(batch) >= BATCH_SIZE:
+            _write(batch)
+            batch = []
+    if batch:
+        _write(batch)
+
+
+def _ensure_writer():
+    """Start the writer thread on first use in this process (including after a fork)"""
+    global _writer
+    if _writer is not None and _writer.is_alive():
+        return
+    with _writer_lock:
+        if _writer is None or not _writer.is_alive():
+            _writer = threading.Thread(target=_run_writer, name='admin-action-log-writer', daemon=True)
+            _writer.start()
+
+
+def _run_writer():
+    stop = False
+    while not stop:
+        batch = []
+        try:
+            # Block for the first entry, then gather more for up to FLUSH_INTERVAL
+            entry = _pending.get()
+            while True:
+                if entry is _STOP:
+                    stop = True
+                    break
+                batch.append(entry)
+                if len(batch) >= BATCH_SIZE:
+                    break
+                entry = _pending.get(timeout=FLUSH_INTERVAL)
+        except queue.Empty:
+            pass
+        if batch:
+            _write(batch)
+        # The writer thread has its own connection; release it per CONN_MAX_AGE
+        close_old_connections()
+
+
+def _write(batch):
+    try:
+        with transaction.atomic():
+            AdminActionLog.objects.bulk_create(batch)
+        return
+    except Exception:
+        if len(batch) == 1:
+            logger.exception("Failed to write admin action log entry: %s", batch[0].action)
+            return
+        logger.warning("Failed to write %d admin action log entries together; writing them one at a time", len(batch))
+    # One bad entry (e.g. its user was deleted while it was queued) only loses that entry
+    for entry in batch:
+        try:
+            with transaction.atomic():
+                entry.save(force_insert=True)
+        except Exception:
+            logger.exception("Failed to write admin action log entry: %s", entry.action)
+
+
+@atexit.register
+def _shutdown():
+    """Let the writer finish its current batch, then write anything still queued"""
+    if _writer is not None and _writer.is_alive():
+        try:
+            _pending.put(_STOP, timeout=FLUSH_INTERVAL)
+            _writer.join(timeout=5)
+        except queue.Full:
+            pass
+    flush()
@@ -8,6 +8,7 @@ from .admin_serializers import (
     AdminUserListSerializer, AdminUserDetailSerializer, AdminUserUpdateSerializer
 )
 from ..models import AdminActionLog
+from ..action_logs import log_admin_action
 from .admin_serializers import AdminActionLogSerializer
 from ..models import CustomUser
 from django.shortcuts import get_object_or_404
@@ -143,6 +144,7 @@ class AdminUserRetrieveUpdateDelete(AdminPermissionMixin, APIView):
             except Exception:
                 admin_user = None
 
+        # Written synchronously: the queued writer would run after user.delete() and hit a missing user
         AdminActionLog.objects.create(admin_username=admin_user, user=user, action='delete', details='Deleted by admin')
         user.delete()
         return Response({'success': True, 'message': 'User deleted'})
@@ -169,23 +171,13 @@ class AdminUserRetrieveUpdateDelete(AdminPermissionMixin, APIView):
             # User is currently active, suspend them
             user.is_active = False
             user.save()
-            AdminActionLog.objects.create(
-                admin_username=admin_user, 
-                user=user, 
-                action='suspend', 
-                details='Suspended by admin'
-            )
+            log_admin_action(admin_user, user, 'suspend', 'Suspended by admin')
             return Response({'success': True, 'message': 'User suspended'})
         else:
             # User is currently suspended, unsuspend them
             user.is_active = True
             user.save()
-            AdminActionLog.objects.create(
-                admin_username=admin_user, 
-                user=user, 
-                action='unsuspend', 
-                details='Unsuspended by admin'
-            )
+            log_admin_action(admin_user, user, 'unsuspend', 'Unsuspended by admin')
             return Response({'success': True, 'message': 'User unsuspended'})
 
     def get_logs(self, request, id):
@@ -224,23 +216,13 @@ class AdminUserSuspendView(AdminPermissionMixin, APIView):
             # User is currently active, suspend them
             user.is_active = False
             user.save()
-            AdminActionLog.objects.create(
-                admin_username=admin_user, 
-                user=user, 
-                action='suspend', 
-                details='Suspended by admin'
-            )
+            log_admin_action(admin_user, user, 'suspend', 'Suspended by admin')
             return Response({'success': True, 'message': 'User suspended'})
         else:
             # User is currently suspended, unsuspend them
             user.is_active = True
             user.save()
-            AdminActionLog.objects.create(
-                admin_username=admin_user, 
-                user=user, 
-                action='unsuspend', 
-                details='Unsuspended by admin'
-            )
+            log_admin_action(admin_user, user, 'unsuspend', 'Unsuspended by admin')
             return Response({'success': True, 'message': 'User unsuspended'})
 
 